@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Golden Citizen Property Metrics Backfill
+One-shot migration that sets the derived sizeSqm and pricePerSqm fields on
+properties stored before they existed, then creates the indexes that serve
+range filters and sorts on them. Safe to re-run: only documents without
+sizeSqm are touched, unless --recompute is given to re-derive every property
+(for example after a fix to size parsing). Running servers drop their cached
+listings through the usual cache generation bump.
+"""
+
+import argparse
+import asyncio
+import time
+
+from pymongo import UpdateOne
+
+import server
+
+async def backfill(batch_size, dry_run, recompute=False):
+    db = server.db
+    query = {} if recompute else {"sizeSqm": {"$exists": False}}
+    pending = await db.properties.count_documents(query)
+    print(f"🔎 {pending:,} properties {'to recompute' if recompute else 'without derived size fields'}")
+
+    updated = 0
+    unparsable = []
+    started = time.perf_counter()
+    last_id = None
+    while True:
+        # Walk by _id so already-updated documents never reappear in later batches
+        batch_query = dict(query, **({"_id": {"$gt": last_id}} if last_id else {}))
+        docs = await db.properties.find(batch_query, {"price": 1, "size": 1}).sort(
+            "_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        requests = []
+        for doc in docs:
+            metrics = server.property_metrics(doc.get("price") or 0, doc.get("size"))
+            if metrics["sizeSqm"] is None:
+                unparsable.append((doc["_id"], doc.get("size")))
+            requests.append(UpdateOne({"_id": doc["_id"]}, {"$set": metrics}))
+        if not dry_run:
+            await db.properties.bulk_write(requests, ordered=False)
+        updated += len(requests)
+        elapsed = time.perf_counter() - started
+        print(f"   {updated:,}/{pending:,} ({updated / elapsed:,.0f} docs/s)")
+
+    for doc_id, size in unparsable[:20]:
+        print(f"⚠️  {doc_id}: no area in size {size!r}, sizeSqm is null")
+    if len(unparsable) > 20:
+        print(f"⚠️  ... and {len(unparsable) - 20} more without a parsable size")
+
+    if dry_run:
+        print(f"✅ Dry run: {updated:,} properties would be updated")
+        return
+    await server.ensure_indexes()
+    if updated:
+        await server.coherence.publish("properties")
+    print(f"✅ Updated {updated:,} properties in {time.perf_counter() - started:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per bulk_write")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--recompute", action="store_true", help="re-derive the fields on every property, not just missing ones")
+    args = parser.parse_args()
+    try:
+        asyncio.run(backfill(args.batch_size, args.dry_run, args.recompute))
+    finally:
+        server.client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Golden Citizen Load Benchmark
+Drives a concurrent, weighted mix of the public endpoints and reports
+throughput and p50/p95/p99 latency per route.
+
+By default the app runs in-process on an httpx ASGI transport, backed by an
+in-memory Mongo stand-in (mongomock-motor) seeded with synthetic properties.
+Use --base-url to benchmark a running server, or --real-mongo to keep the
+MONGO_URL database. Save a run with --save and diff later runs against it
+with --compare to catch regressions between commits.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'golden_citizen_bench')
+
+import server
+from bench_serialization import make_documents
+
+DEFAULT_MIX = "properties=50,property=25,company-info=20,contact=5"
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route {name!r}, expected one of {', '.join(ROUTES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+async def hit_properties(client, state):
+    return await client.get("/api/properties", params={"limit": 24})
+
+async def hit_property(client, state):
+    return await client.get(f"/api/properties/{state.rng.choice(state.property_ids)}")
+
+async def hit_company_info(client, state):
+    return await client.get("/api/company-info")
+
+async def hit_contact(client, state):
+    # Unique messages, otherwise duplicate suppression turns writes into reads
+    state.sequence += 1
+    return await client.post("/api/contact", json={
+        "name": "Yük Testi",
+        "email": f"load{state.sequence}@example.com",
+        "phone": "+90 555 000 00 00",
+        "message": f"Golden Visa hakkında bilgi almak istiyorum ({state.sequence})",
+    })
+
+ROUTES = {
+    "properties": hit_properties,
+    "property": hit_property,
+    "company-info": hit_company_info,
+    "contact": hit_contact,
+}
+
+class RunState:
+    def __init__(self, seed, property_ids):
+        self.rng = random.Random(seed)
+        self.property_ids = property_ids
+        self.sequence = 0
+        self.latencies = {name: [] for name in ROUTES}
+        self.errors = {name: 0 for name in ROUTES}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+async def worker(client, state, mix, deadline, budget):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline and budget[0] > 0:
+        budget[0] -= 1
+        name = state.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await ROUTES[name](client, state)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        state.latencies[name].append((time.perf_counter() - started) * 1000)
+        if not ok:
+            state.errors[name] += 1
+
+async def prepare_in_process(args):
+    """Point server.py at a seeded in-memory Mongo stand-in and run its startup hooks"""
+    if not args.real_mongo:
+        from mongomock_motor import AsyncMongoMockClient
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[os.environ['DB_NAME']]
+        await server.db.properties.insert_many(make_documents(args.properties))
+    if not args.rate_limit:
+        server.rate_limit_policies.clear()
+    await server.app.router.startup()
+    ids = await server.db.properties.distinct("_id", {"isActive": True})
+    return [str(_id) for _id in ids]
+
+async def discover_property_ids(client):
+    response = await client.get("/api/properties", params={"limit": 200})
+    response.raise_for_status()
+    return [prop["_id"] for prop in response.json()]
+
+async def run(args):
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+        property_ids = await discover_property_ids(client)
+    else:
+        property_ids = await prepare_in_process(args)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app),
+                                   base_url="http://bench", timeout=30)
+    if not property_ids:
+        sys.exit("No active properties to benchmark against")
+
+    state = RunState(args.seed, property_ids)
+    budget = [args.requests]
+    started = time.perf_counter()
+    deadline = started + args.duration
+    async with client:
+        await asyncio.gather(*(
+            worker(client, state, args.mix, deadline, budget) for _ in range(args.concurrency)
+        ))
+    elapsed = time.perf_counter() - started
+    if not args.base_url:
+        await server.app.router.shutdown()
+
+    routes = {}
+    for name, latencies in state.latencies.items():
+        if not latencies:
+            continue
+        latencies.sort()
+        routes[name] = {
+            "requests": len(latencies),
+            "errors": state.errors[name],
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        }
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "createdAt": datetime.utcnow().isoformat(),
+        "target": args.base_url or ("in-process, real Mongo" if args.real_mongo else "in-process, Mongo stand-in"),
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "elapsedSeconds": round(elapsed, 3),
+        "totalRps": round(total / elapsed, 1),
+        "routes": routes,
+    }
+
+def print_report(report, baseline=None):
+    print(f"Target: {report['target']}  concurrency={report['concurrency']}  "
+          f"elapsed={report['elapsedSeconds']}s  total RPS={report['totalRps']}")
+    print(f"{'route':<14}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, route in report["routes"].items():
+        line = (f"{name:<14}{route['requests']:>10}{route['errors']:>8}{route['rps']:>10}"
+                f"{route['p50']:>10}{route['p95']:>10}{route['p99']:>10}")
+        base = (baseline or {}).get("routes", {}).get(name)
+        if base:
+            line += f"   p95 {pct_change(base['p95'], route['p95']):+.1f}%  rps {pct_change(base['rps'], route['rps']):+.1f}%"
+        print(line)
+
+def pct_change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+def regressions(report, baseline, threshold):
+    """Routes whose p95 latency grew by more than threshold percent"""
+    found = []
+    for name, route in report["routes"].items():
+        base = baseline.get("routes", {}).get(name)
+        if base and pct_change(base["p95"], route["p95"]) > threshold:
+            found.append(name)
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="benchmark a running server instead, e.g. http://localhost:8001")
+    parser.add_argument("--real-mongo", action="store_true", help="in-process app against MONGO_URL/DB_NAME")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run at most")
+    parser.add_argument("--requests", type=int, default=20000, help="requests to send at most")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weighted route mix (default {DEFAULT_MIX})")
+    parser.add_argument("--properties", type=int, default=500, help="properties seeded into the stand-in")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the write rate limits enabled")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write the report as a baseline JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to diff against")
+    parser.add_argument("--fail-over", type=float, default=None,
+                        help="exit 1 when a route's p95 regresses by more than this percent")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+    if baseline and args.fail_over is not None:
+        regressed = regressions(report, baseline, args.fail_over)
+        if regressed:
+            print(f"p95 regressed by more than {args.fail_over}% on: {', '.join(regressed)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Golden Citizen Serialization Benchmark
+Compares the cost of encoding property list responses per 1k documents:
+the legacy path (str(_id) loop, response_model validation, stdlib json)
+against the fast path used by server.py (orjson on projected documents)
+"""
+
+import argparse
+import json
+import os
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+# server.py connects lazily, so any URL lets us import its encoders
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'golden_citizen_bench')
+
+from server import Property, PROPERTY_DEFAULTS, dump_json
+
+LOCATIONS = ["Kolonaki, Atina", "Oia, Santorini", "Selanik Merkez", "Glyfada, Atina", "Chania, Girit"]
+TYPES = ["Daire", "Villa", "Townhouse", "Resort Daire"]
+
+def make_documents(count, seed=42):
+    """Build raw documents shaped like the properties collection"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Yatırımlık Gayrimenkul {i}",
+            "location": rng.choice(LOCATIONS),
+            "price": rng.randrange(250000, 1500000, 5000),
+            "type": rng.choice(TYPES),
+            "size": f"{rng.randint(45, 400)} m²",
+            "bedrooms": rng.randint(1, 6),
+            "bathrooms": rng.randint(1, 4),
+            "features": ["Deniz Manzarası", "Merkezi Konum", "Yüksek Kira Potansiyeli"],
+            "description": "Ege Denizi manzaralı, metro ve alışveriş merkezlerine yürüme mesafesinde yatırımlık daire. " * 3,
+            "imageUrl": "/api/placeholder/400/300",
+            "gallery": ["/api/placeholder/400/300"] * 3,
+            "externalRef": f"bench-{i}",
+            "isActive": True,
+            "createdAt": start + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+property_list_adapter = TypeAdapter(List[Property])
+
+def legacy_encode(documents):
+    """What the handler + FastAPI response_model pipeline used to do"""
+    for doc in documents:
+        doc["_id"] = str(doc["_id"])
+    validated = property_list_adapter.validate_python(documents)
+    content = jsonable_encoder(property_list_adapter.dump_python(validated, mode="json", by_alias=True))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def fast_encode(documents):
+    """The path taken by load_properties_body"""
+    return dump_json([{**PROPERTY_DEFAULTS, **doc} for doc in documents])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000, help="documents per encoded response")
+    parser.add_argument("--repeat", type=int, default=50, help="timed encodings per path")
+    args = parser.parse_args()
+
+    documents = make_documents(args.docs)
+    per_1k = 1000 / args.docs
+    results = {}
+    for name, encode in (("legacy", legacy_encode), ("fast", fast_encode)):
+        # Each run gets fresh copies since the legacy path mutates _id in place
+        batches = [[dict(doc) for doc in documents] for _ in range(args.repeat)]
+        elapsed = timeit.timeit(lambda: encode(batches.pop()), number=args.repeat)
+        results[name] = elapsed / args.repeat * per_1k * 1000
+        print(f"{name:>6}: {results[name]:8.3f} ms per 1k documents")
+
+    print(f"speedup: {results['legacy'] / results['fast']:.1f}x")
+
+if __name__ == "__main__":
+    main()
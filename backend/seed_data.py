@@ -2,22 +2,48 @@
 """
 Golden Citizen Database Seeding Script
 This script populates the database with initial property and company data
+
+With --properties and/or --contacts it instead generates that many synthetic
+Turkish/Greek listings and contact submissions for capacity testing. Output
+is deterministic for a given --seed (including _id values) and is written
+with concurrent, chunked insert_many. Use --mock to run against an in-memory
+Mongo stand-in (mongomock-motor) instead of MONGO_URL.
 """
 
+import argparse
 import asyncio
+import hashlib
 import os
+import random
+import struct
+import time
+import orjson
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client = None
+db = None
+
+def connect(mock=False):
+    """Open the MongoDB client, tuned by the same environment variables as server.py"""
+    global client, db
+    if mock:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+            connectTimeoutMS=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+            serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+        )
+    db = client[os.environ.get('DB_NAME', 'golden_citizen')]
 
 async def seed_properties():
     """Seed the database with sample properties"""
@@ -114,6 +140,12 @@ async def seed_properties():
         }
     ]
     
+    # Derived numeric fields, as server.property_metrics stores them
+    for prop in properties:
+        size_sqm = int(prop["size"].split()[0])
+        prop["sizeSqm"] = size_sqm
+        prop["pricePerSqm"] = round(prop["price"] / size_sqm)
+    
     # Clear existing properties
     await db.properties.delete_many({})
     
@@ -159,8 +191,170 @@ async def seed_company_info():
     result = await db.company_info.insert_one(company_info)
     print(f"✅ Inserted company information with ID: {result.inserted_id}")
 
-async def main():
+# Synthetic data vocabulary: (location, price per m² in EUR, latitude, longitude)
+SYNTHETIC_LOCATIONS = [
+    ("Kolonaki, Atina", 5200, 37.9795, 23.7442), ("Glyfada, Atina", 4800, 37.8626, 23.7530),
+    ("Vouliagmeni, Atina", 6500, 37.8100, 23.7800), ("Kifisia, Atina", 4200, 38.0740, 23.8110),
+    ("Pire Merkez", 3100, 37.9420, 23.6465), ("Kallithea, Atina", 2700, 37.9550, 23.7020),
+    ("Selanik Merkez", 2600, 40.6401, 22.9444), ("Kalamaria, Selanik", 2900, 40.5820, 22.9500),
+    ("Oia, Santorini", 7800, 36.4618, 25.3753), ("Fira, Santorini", 6200, 36.4166, 25.4322),
+    ("Platys Gialos, Mykonos", 8500, 37.4110, 25.3480), ("Chania, Girit", 3300, 35.5138, 24.0180),
+    ("Heraklion, Girit", 2800, 35.3387, 25.1442), ("Rodos Eski Şehir", 3600, 36.4440, 28.2260),
+    ("Korfu Merkez", 3400, 39.6243, 19.9217), ("Kassandra, Halkidiki", 3000, 40.0500, 23.4200),
+    ("Nafplio, Peloponez", 2500, 37.5673, 22.8015), ("Paros Parikia", 4600, 37.0850, 25.1500),
+]
+SYNTHETIC_TYPES = [("Daire", 0.55, (45, 160)), ("Villa", 0.15, (140, 420)),
+                   ("Townhouse", 0.15, (90, 220)), ("Resort Daire", 0.15, (40, 110))]
+SYNTHETIC_ADJECTIVES = ["Luxury", "Modern", "Deniz Manzaralı", "Yenilenmiş", "Merkezi", "Premium",
+                        "Bahçeli", "Yatırımlık", "Butik", "Panoramik"]
+SYNTHETIC_FEATURES = ["Deniz Manzarası", "Şehir Manzarası", "Merkezi Konum", "Yüksek Kira Potansiyeli",
+                      "Garantili Kira", "Yeni Proje", "Özel Havuz", "Otopark", "Asansör", "Balkon",
+                      "Turizm Potansiyeli", "Metroya Yakın", "Plaja Yürüme Mesafesi", "Akıllı Ev Sistemi"]
+SYNTHETIC_FIRST_NAMES = ["Ahmet", "Mehmet", "Ayşe", "Fatma", "Mustafa", "Zeynep", "Emre", "Elif", "Burak",
+                         "Selin", "Oğuz", "Gökçe", "İbrahim", "Şule", "Çağlar", "Ümit", "Deniz", "Can"]
+SYNTHETIC_LAST_NAMES = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Öztürk", "Aydın",
+                        "Arslan", "Doğan", "Kılıç", "Aslan", "Koç", "Güneş", "Erdoğan", "Özdemir"]
+SYNTHETIC_SUBJECTS = ["Golden Visa Danışmanlığı", "Yatırım Danışmanlığı", "Gayrimenkul Bilgisi",
+                      "Vize Süreci", "Kira Getirisi"]
+SYNTHETIC_MESSAGES = [
+    "{location} bölgesinde {budget} € bütçeyle Golden Visa için uygun mülk arıyorum.",
+    "{location} hakkında bilgi alabilir miyim? Ailemle birlikte başvurmak istiyoruz.",
+    "Golden Visa süreci ne kadar sürüyor? {budget} € civarında yatırım düşünüyorum.",
+    "{location} için kira getirisi ve aidat bilgisi rica ediyorum.",
+]
+ASCII_FOLD = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+SYNTHETIC_EPOCH = datetime(2023, 1, 1)
+
+def synthetic_id(kind, index, created):
+    """Deterministic ObjectId: the createdAt timestamp, then collection kind and index bytes"""
+    seconds = int((created - datetime(1970, 1, 1)).total_seconds())
+    return ObjectId(struct.pack(">IBxxxI", seconds, kind, index))
+
+def make_properties(seed, start, count):
+    """Generate properties start .. start+count-1; each chunk has its own RNG, so output
+    does not depend on chunking or concurrency"""
+    rng = random.Random(f"{seed}:properties:{start}")
+    types = [name for name, _, _ in SYNTHETIC_TYPES]
+    type_weights = [weight for _, weight, _ in SYNTHETIC_TYPES]
+    size_ranges = {name: sizes for name, _, sizes in SYNTHETIC_TYPES}
+    docs = []
+    for index in range(start, start + count):
+        location, price_per_sqm, lat, lng = rng.choice(SYNTHETIC_LOCATIONS)
+        # Scatter listings up to roughly 2 km around the area centre
+        lat, lng = round(lat + rng.uniform(-0.018, 0.018), 6), round(lng + rng.uniform(-0.022, 0.022), 6)
+        prop_type = rng.choices(types, type_weights)[0]
+        size = rng.randint(*size_ranges[prop_type])
+        # Golden Visa listings cluster at or above the €250k threshold
+        price = max(250000, round(size * price_per_sqm * rng.uniform(0.85, 1.2), -3))
+        bedrooms = max(1, min(6, size // 40 + rng.randint(-1, 1)))
+        area = location.split(",")[0]
+        created = SYNTHETIC_EPOCH + timedelta(minutes=index, seconds=rng.randint(0, 59))
+        docs.append({
+            "_id": synthetic_id(1, index, created),
+            "title": f"{area} {rng.choice(SYNTHETIC_ADJECTIVES)} {prop_type}",
+            "location": location,
+            "price": int(price),
+            "type": prop_type,
+            "size": f"{size} m²",
+            "sizeSqm": size,
+            "pricePerSqm": round(price / size),
+            "bedrooms": bedrooms,
+            "bathrooms": max(1, bedrooms - rng.randint(0, 2)),
+            "features": rng.sample(SYNTHETIC_FEATURES, rng.randint(2, 5)),
+            "description": f"{location} bölgesinde {size} m², {bedrooms} yatak odalı {prop_type.lower()}. "
+                           f"Golden Visa programına uygun, {rng.randint(1, 15)} dakika mesafede ulaşım ve alışveriş.",
+            "imageUrl": "/api/placeholder/400/300",
+            "gallery": ["/api/placeholder/400/300"] * rng.randint(1, 5),
+            "coordinates": {"lat": lat, "lng": lng},
+            "geo": {"type": "Point", "coordinates": [lng, lat]},
+            "externalRef": f"synthetic-{index}",
+            "isActive": rng.random() < 0.97,
+            "createdAt": created,
+        })
+    return docs
+
+def make_contacts(seed, start, count):
+    """Generate contact submissions start .. start+count-1, like make_properties"""
+    rng = random.Random(f"{seed}:contacts:{start}")
+    docs = []
+    for index in range(start, start + count):
+        name = f"{rng.choice(SYNTHETIC_FIRST_NAMES)} {rng.choice(SYNTHETIC_LAST_NAMES)}"
+        email = f"{name.translate(ASCII_FOLD).lower().replace(' ', '.')}{index}@example.com"
+        phone = f"+90 5{rng.randint(30, 59)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}"
+        subject = rng.choice(SYNTHETIC_SUBJECTS)
+        message = rng.choice(SYNTHETIC_MESSAGES).format(
+            location=rng.choice(SYNTHETIC_LOCATIONS)[0], budget=f"{rng.randrange(250, 1000, 50)}.000")
+        created = SYNTHETIC_EPOCH + timedelta(seconds=index * 30 + rng.randint(0, 29))
+        docs.append({
+            "_id": synthetic_id(2, index, created),
+            "name": name,
+            "email": email,
+            "phone": phone,
+            "subject": subject,
+            "message": message,
+            "isRead": rng.random() < 0.6,
+            # Same content hash as server.contact_fingerprint
+            "contentHash": hashlib.sha256(orjson.dumps(
+                [field.strip().casefold() for field in (name, email, phone, subject, message)])).hexdigest(),
+            "createdAt": created,
+        })
+    return docs
+
+async def generate(collection, make, total, seed, chunk_size, concurrency):
+    """Replace a collection with total generated documents, concurrent chunked insert_many"""
+    await db[collection].delete_many({})
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    inserted = 0
+    last_report = started
+    
+    async def insert_chunk(start):
+        nonlocal inserted, last_report
+        try:
+            docs = make(seed, start, min(chunk_size, total - start))
+            await db[collection].insert_many(docs, ordered=False)
+        finally:
+            semaphore.release()
+        inserted += len(docs)
+        now = time.perf_counter()
+        if now - last_report >= 1 or inserted == total:
+            last_report = now
+            print(f"   {collection}: {inserted:,}/{total:,} ({inserted / total:.0%}), "
+                  f"{inserted / (now - started):,.0f} docs/s")
+    
+    tasks = []
+    for start in range(0, total, chunk_size):
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(insert_chunk(start)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Inserted {inserted:,} {collection} in {elapsed:.1f}s ({inserted / elapsed:,.0f} docs/s)")
+
+async def seed_synthetic(args):
+    """Generate synthetic properties and contacts at the requested volume"""
+    print(f"🌱 Generating synthetic data (seed={args.seed}, chunk={args.chunk_size}, "
+          f"concurrency={args.concurrency})...")
+    if args.properties:
+        await generate("properties", make_properties, args.properties, args.seed,
+                       args.chunk_size, args.concurrency)
+    if args.contacts:
+        await generate("contacts", make_contacts, args.contacts, args.seed,
+                       args.chunk_size, args.concurrency)
+    if not await db.company_info.count_documents({}):
+        await seed_company_info()
+
+async def main(args):
     """Main seeding function"""
+    connect(args.mock)
+    if args.properties or args.contacts:
+        try:
+            await seed_synthetic(args)
+        except Exception as e:
+            print(f"❌ Error during seeding: {e}")
+        finally:
+            client.close()
+        return
+    
     print("🌱 Starting database seeding for Golden Citizen...")
     
     try:
@@ -182,4 +376,11 @@ async def main():
         client.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=0, help="synthetic properties to generate")
+    parser.add_argument("--contacts", type=int, default=0, help="synthetic contacts to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="documents per insert_many")
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many calls in flight")
+    parser.add_argument("--mock", action="store_true", help="use an in-memory Mongo stand-in (measures generation and insert throughput)")
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
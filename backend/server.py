@@ -1,24 +1,337 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response, File, UploadFile
 from dotenv import load_dotenv
+from fastapi.responses import FileResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo import monitoring
 import os
+import re
+import json
+import io
+import csv
+import gzip
+import base64
+import hashlib
+import asyncio
+import bisect
+import heapq
+import math
+import unicodedata
+import time
 import logging
+import threading
+import tempfile
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
+import orjson
+from PIL import Image, ImageOps
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Metrics, exposed in Prometheus text format on /api/metrics
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Histogram:
+    """Prometheus-style histogram; counts are stored per bucket and summed on render"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class MetricsRegistry:
+    """Labelled counters and latency histograms, safe to update from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def render(self, extra=()):
+        """Render every metric, plus (name, labels, value) gauge samples in extra"""
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = [(key, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()]
+        lines = []
+        described = set()
+        
+        def header(name):
+            if name not in described and name in self._help:
+                kind, text = self._help[name]
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+            described.add(name)
+        
+        for (name, labels), value in sorted(counters):
+            header(name)
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), counts, total, count in sorted(histograms, key=lambda item: item[0]):
+            header(name)
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{name}_count{format_labels(labels)} {count}")
+        for name, labels, value in sorted(extra, key=lambda sample: sample[0]):
+            header(name)
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+metrics = MetricsRegistry()
+metrics.describe("http_requests_total", "counter", "HTTP requests by method, route and status")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by method and route")
+metrics.describe("mongo_command_duration_seconds", "histogram", "MongoDB command latency by collection and command")
+metrics.describe("mongo_command_failures_total", "counter", "Failed MongoDB commands by collection and command")
+metrics.describe("serialization_duration_seconds", "histogram", "Response body encoding time by encoder")
+metrics.describe("event_loop_lag_seconds", "histogram", "Delay of a periodic event loop timer past its deadline")
+metrics.describe("cache_hits_total", "counter", "In-process cache hits")
+metrics.describe("cache_misses_total", "counter", "In-process cache misses")
+metrics.describe("cache_entries", "gauge", "In-process cache size")
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command per collection; runs on pymongo's threads"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        self._collections[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else ""
+        )
+
+    def _finish(self, event):
+        return (self._collections.pop((event.connection_id, event.request_id), ""), event.command_name)
+
+    def succeeded(self, event):
+        labels = self._finish(event)
+        metrics.observe("mongo_command_duration_seconds",
+                        (("collection", labels[0]), ("command", labels[1])), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        labels = (("collection", self._finish(event)[0]), ("command", event.command_name))
+        metrics.observe("mongo_command_duration_seconds", labels, event.duration_micros / 1e6)
+        metrics.inc("mongo_command_failures_total", labels)
+
+class MongoPoolStats(monitoring.ConnectionPoolListener):
+    """Tracks connection pool usage from CMAP events; runs on pymongo's threads"""
+
+    def __init__(self):
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.check_out_failures = 0
+        self._lock = threading.Lock()
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.check_out_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "maxPoolSize": MONGO_MAX_POOL_SIZE,
+                "open": self.open,
+                "inUse": self.in_use,
+                "waiting": self.waiting,
+                "checkOutFailures": self.check_out_failures,
+                # maxPoolSize=0 means an unbounded pool, which never saturates
+                "saturation": round(self.in_use / MONGO_MAX_POOL_SIZE, 3) if MONGO_MAX_POOL_SIZE else None,
+            }
+
+# MongoDB connection pool and query time limits
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+# Server-side limit applied to the request-path read queries
+MONGO_MAX_TIME_MS = int(os.environ.get('MONGO_MAX_TIME_MS', '5000'))
+# Connections opened concurrently at startup so the first requests find a warm pool
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', str(MONGO_MIN_POOL_SIZE)))
+# Seconds between warm-up attempts while MongoDB is unreachable
+WARMUP_RETRY_SECONDS = float(os.environ.get('WARMUP_RETRY_SECONDS', '5'))
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_pool = MongoPoolStats()
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    event_listeners=[MongoCommandMetrics(), mongo_pool],
+)
 db = client[os.environ['DB_NAME']]
 
+# Property listing page sizes
+PROPERTY_PAGE_SIZE = int(os.environ.get('PROPERTY_PAGE_SIZE', '50'))
+PROPERTY_PAGE_SIZE_MAX = int(os.environ.get('PROPERTY_PAGE_SIZE_MAX', '200'))
+
+# Default and maximum radius of a near= property search
+NEAR_RADIUS_KM = float(os.environ.get('NEAR_RADIUS_KM', '25'))
+NEAR_RADIUS_KM_MAX = float(os.environ.get('NEAR_RADIUS_KM_MAX', '500'))
+
+# Most IDs accepted by one batch property lookup
+PROPERTY_BATCH_MAX = int(os.environ.get('PROPERTY_BATCH_MAX', '300'))
+
+# In-process read cache
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '300'))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '1024'))
+
+# Cross-worker cache coherence: how often readers poll the generation counters,
+# and whether to follow them through a change stream (needs a replica set)
+COHERENCE_INTERVAL = float(os.environ.get('COHERENCE_INTERVAL', '1.0'))
+COHERENCE_CHANGE_STREAM = os.environ.get('COHERENCE_CHANGE_STREAM', 'false').lower() == 'true'
+
+# Cache-Control policies of the cacheable read routes
+PROPERTY_CACHE_CONTROL = os.environ.get(
+    'PROPERTY_CACHE_CONTROL', 'public, max-age=60, stale-while-revalidate=300')
+COMPANY_INFO_CACHE_CONTROL = os.environ.get(
+    'COMPANY_INFO_CACHE_CONTROL', 'public, max-age=300, stale-while-revalidate=3600')
+
+# Placeholder images: largest accepted dimension and rendered images kept in memory
+PLACEHOLDER_MAX_SIZE = int(os.environ.get('PLACEHOLDER_MAX_SIZE', '2000'))
+PLACEHOLDER_CACHE_ENTRIES = int(os.environ.get('PLACEHOLDER_CACHE_ENTRIES', '256'))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Uploaded gallery images and their resized variants
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', ROOT_DIR / 'media'))
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', str(15 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+
+# Price buckets of the facets endpoint, split at the Golden Visa investment thresholds
+PRICE_BUCKET_BOUNDARIES = [0, 250000, 400000, 800000]
+
+# Write-behind contact submissions: acknowledged once queued, flushed with insert_many
+CONTACT_WRITE_BEHIND = os.environ.get('CONTACT_WRITE_BEHIND', 'false').lower() == 'true'
+CONTACT_QUEUE_SIZE = int(os.environ.get('CONTACT_QUEUE_SIZE', '1000'))
+CONTACT_BATCH_SIZE = int(os.environ.get('CONTACT_BATCH_SIZE', '100'))
+CONTACT_FLUSH_INTERVAL = float(os.environ.get('CONTACT_FLUSH_INTERVAL', '0.5'))
+CONTACT_ENQUEUE_TIMEOUT = float(os.environ.get('CONTACT_ENQUEUE_TIMEOUT', '2.0'))
+# Submissions still unstored at shutdown are appended here as NDJSON
+CONTACT_DEAD_LETTER_PATH = Path(os.environ.get('CONTACT_DEAD_LETTER_PATH', ROOT_DIR / 'dead_letter' / 'contacts.ndjson'))
+
+# Bulk property import
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '500'))
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', '1000'))
+IMPORT_MAX_LINE_BYTES = int(os.environ.get('IMPORT_MAX_LINE_BYTES', str(1024 * 1024)))
+
+# Idempotency-Key replay window and identical contact message suppression window
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_CACHE_ENTRIES = int(os.environ.get('IDEMPOTENCY_CACHE_ENTRIES', '10000'))
+# How long a reserved key stays locked; a retry may take over a pending key after this
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '60'))
+CONTACT_DEDUPE_SECONDS = int(os.environ.get('CONTACT_DEDUPE_SECONDS', '600'))
+
+# Rate limiting of unauthenticated writes. RATE_LIMITS overrides the per-route
+# policies as JSON, e.g. {"POST /api/contact": {"rate": 0.1, "burst": 5}}
+RATE_LIMITS = json.loads(os.environ.get('RATE_LIMITS', '{}'))
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', '10000'))
+RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+# Proxies in front of the app that append to X-Forwarded-For; the client address
+# is the entry this many places from the right (earlier entries are client-supplied)
+RATE_LIMIT_PROXY_HOPS = int(os.environ.get('RATE_LIMIT_PROXY_HOPS', '1'))
+# "memory" (per worker) or "mongo" (per-minute windows shared by all workers)
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory').lower()
+
+# Cached bodies smaller than this are always sent uncompressed
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+
+# Query plan diagnostics: "off", "warn" (log offending plans) or "strict" (refuse to start)
+QUERY_PLAN_CHECK = os.environ.get('QUERY_PLAN_CHECK', 'off').lower()
+
 # Create the main app without a prefix
 app = FastAPI(title="Golden Citizen API", description="API for Golden Citizen Greece Golden Visa website")
 
@@ -29,7 +342,268 @@ api_router = APIRouter(prefix="/api")
 def objectid_str(v):
     return str(v) if isinstance(v, ObjectId) else v
 
+# Placeholder SVG template; all values are integers so no escaping is needed
+PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}">'
+    '<rect width="100%" height="100%" fill="#e5e7eb"/>'
+    '<text x="50%" y="50%" fill="#9ca3af" font-family="sans-serif" font-size="{font}" '
+    'text-anchor="middle" dominant-baseline="middle">{w} × {h}</text></svg>'
+)
+
+# Listing sort orders: name -> (field, direction); _id breaks ties in the same direction
+PROPERTY_SORTS = {
+    "created": ("createdAt", 1),
+    "price": ("price", 1),
+    "-price": ("price", -1),
+    "size": ("sizeSqm", 1),
+    "-size": ("sizeSqm", -1),
+    "pricePerSqm": ("pricePerSqm", 1),
+    "-pricePerSqm": ("pricePerSqm", -1),
+    # Only with near=; distance is computed by $geoNear, in meters
+    "distance": ("distance", 1),
+}
+
+# Keyset pagination helpers: a cursor is the (sort value, _id) pair of the last
+# document on the previous page, encoded as URL-safe base64 JSON
+def encode_cursor(doc, sort="created"):
+    field, _ = PROPERTY_SORTS[sort]
+    if sort == "created":
+        payload = {"c": doc["createdAt"].isoformat(), "i": str(doc["_id"])}
+    else:
+        payload = {"s": sort, "v": doc[field], "i": str(doc["_id"])}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor, sort="created"):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not ObjectId.is_valid(payload["i"]) or payload.get("s", "created") != sort:
+            raise ValueError("invalid id or sort")
+        if sort == "created":
+            return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+        if isinstance(payload["v"], bool) or not isinstance(payload["v"], (int, float)):
+            raise ValueError("invalid sort value")
+        return payload["v"], ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_after(value, last_id, sort="created"):
+    """Query fragment selecting documents sorted after (sort value, _id)"""
+    field, direction = PROPERTY_SORTS[sort]
+    op = "$gt" if direction == 1 else "$lt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "_id": {op: last_id}},
+    ]}
+
+SIZE_NUMBER = r"\d{1,3}(?:[.,]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?"
+SIZE_WITH_UNIT = re.compile(rf"(?<![\d.,])({SIZE_NUMBER})\s*(?:m²|m2|m\^2|metrekare|sqm)(?![a-z0-9])", re.IGNORECASE)
+
+def parse_size_number(text):
+    """Float from "1.250,5", "1,250.5", "85,5" or "1.250" (Turkish or English separators)"""
+    if "." in text and "," in text:
+        # Whichever separator comes last is the decimal point
+        decimal = "," if text.rfind(",") > text.rfind(".") else "."
+        text = text.replace("." if decimal == "," else ",", "").replace(decimal, ".")
+    elif re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", text):
+        text = re.sub(r"[.,]", "", text)
+    else:
+        text = text.replace(",", ".")
+    return float(text)
+
+def parse_size_sqm(size):
+    """Area in m² from a free-text size such as "3+1, 120 m²", "85,5 m2" or "1.250,5 m²"
+
+    Only a number directly followed by an area unit counts, so room counts
+    like "3+1" are skipped; when both gross ("Brüt") and net areas are given
+    the net one wins. A bare number ("120") is read as m². Returns None when
+    the text holds no positive area.
+    """
+    size = size or ""
+    matches = list(SIZE_WITH_UNIT.finditer(size))
+    if matches:
+        net = [m for m in matches if size[:m.start()].rstrip(" :").lower().endswith("net")]
+        text = (net or matches)[0].group(1)
+    elif re.fullmatch(SIZE_NUMBER, size.strip()):
+        text = size.strip()
+    else:
+        return None
+    value = parse_size_number(text)
+    if value <= 0:
+        return None
+    return int(value) if value.is_integer() else value
+
+def property_metrics(price, size):
+    """Derived numeric fields stored with every property for range filters and sorts"""
+    size_sqm = parse_size_sqm(size)
+    return {
+        "sizeSqm": size_sqm,
+        "pricePerSqm": round(price / size_sqm) if size_sqm else None,
+    }
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight load
+
+    The first caller starts loader() as a task; callers arriving while it
+    runs await the same task. Each waiter is shielded, so a cancelled request
+    does not abort the load the others are waiting on.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.coalesced = 0
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    async def do(self, key, loader):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a TTL
+
+    Keys are tuples whose first element names the cached resource, so that
+    writes can drop every entry of a resource with invalidate(). Concurrent
+    misses on one key share a single load.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._flight = SingleFlight()
+        # Bumped by invalidate() so loads that started before it are not stored
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *resources):
+        """Drop the entries of the given resources, or everything when none are given"""
+        self._generation += 1
+        if not resources:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] in resources]:
+            del self._entries[key]
+
+    async def get_or_load(self, key, loader):
+        """Return the cached value for key, awaiting loader() on a miss"""
+        value = self.get(key)
+        if value is None:
+            # Callers arriving after an invalidate() must not join a load that started before it
+            generation = self._generation
+            value = await self._flight.do((key, generation), lambda: self._load(key, loader, generation))
+        return value
+
+    async def _load(self, key, loader, generation):
+        value = await loader()
+        if generation == self._generation:
+            self.set(key, value)
+        return value
+
+read_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+# Rendered placeholders never change, so entries only leave by LRU eviction
+placeholder_cache = TTLCache(PLACEHOLDER_CACHE_ENTRIES, math.inf)
+
+def invalidate_properties():
+    """Drop cached property reads after a write to the properties collection"""
+    read_cache.invalidate("properties", "property", "facets")
+
+def parse_coordinates(text, count, name):
+    """Parse a comma-separated list of count numbers, raising 400 when malformed"""
+    try:
+        values = [float(part) for part in text.split(",")]
+    except ValueError:
+        values = []
+    if len(values) != count:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}")
+    return values
+
+def parse_near(near):
+    """GeoJSON [lng, lat] of a near=lat,lng parameter"""
+    lat, lng = parse_coordinates(near, 2, "near")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=400, detail="Invalid near")
+    return [lng, lat]
+
+def parse_within(within):
+    """GeoJSON polygon of a within=south,west,north,east viewport"""
+    south, west, north, east = parse_coordinates(within, 4, "within")
+    if not (-90 <= south < north <= 90 and -180 <= west < east <= 180):
+        raise HTTPException(status_code=400, detail="Invalid within")
+    return {"type": "Polygon", "coordinates": [[
+        [west, south], [east, south], [east, north], [west, north], [west, south],
+    ]]}
+
+def property_geo(coordinates):
+    """GeoJSON point stored alongside a property's coordinates for the 2dsphere index"""
+    if not coordinates:
+        return {"geo": None}
+    return {"geo": {"type": "Point", "coordinates": [coordinates["lng"], coordinates["lat"]]}}
+
+def build_property_query(type=None, location=None, min_price=None, max_price=None,
+                         bedrooms=None, min_bedrooms=None, min_size=None, max_size=None,
+                         min_price_per_sqm=None, max_price_per_sqm=None, within=None, sort="created"):
+    """Translate listing filters into a Mongo query on active properties"""
+    query = {"isActive": True}
+    if type:
+        query["type"] = type
+    if location:
+        query["location"] = {"$regex": re.escape(location), "$options": "i"}
+    for field, low, high in (("price", min_price, max_price), ("sizeSqm", min_size, max_size),
+                             ("pricePerSqm", min_price_per_sqm, max_price_per_sqm)):
+        if low is not None or high is not None:
+            query[field] = {}
+            if low is not None:
+                query[field]["$gte"] = low
+            if high is not None:
+                query[field]["$lte"] = high
+    if bedrooms is not None:
+        query["bedrooms"] = bedrooms
+    elif min_bedrooms is not None:
+        query["bedrooms"] = {"$gte": min_bedrooms}
+    if within is not None:
+        query["geo"] = {"$geoWithin": {"$geometry": within}}
+    # Properties whose size could not be parsed have no place in an area or value ordering
+    sort_field, _ = PROPERTY_SORTS[sort]
+    if sort_field in ("sizeSqm", "pricePerSqm"):
+        query.setdefault(sort_field, {})["$ne"] = None
+    return query
+
 # Pydantic Models
+class Coordinates(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+
 class Property(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
     title: str
@@ -43,6 +617,10 @@ class Property(BaseModel):
     description: str
     imageUrl: str = "/api/placeholder/400/300"
     gallery: List[str] = []
+    externalRef: Optional[str] = None
+    sizeSqm: Optional[float] = None
+    pricePerSqm: Optional[int] = None
+    coordinates: Optional[Coordinates] = None
     isActive: bool = True
     createdAt: datetime = Field(default_factory=datetime.utcnow)
 
@@ -62,6 +640,13 @@ class PropertyCreate(BaseModel):
     description: str
     imageUrl: str = "/api/placeholder/400/300"
     gallery: List[str] = []
+    coordinates: Optional[Coordinates] = None
+
+class PropertyImport(PropertyCreate):
+    externalRef: str = Field(..., min_length=1)
+
+class PropertyBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=PROPERTY_BATCH_MAX)
 
 class Contact(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
@@ -115,107 +700,1482 @@ class CompanyInfo(BaseModel):
         populate_by_name = True
         json_encoders = {ObjectId: str}
 
+property_adapter = TypeAdapter(Property)
+company_info_adapter = TypeAdapter(CompanyInfo)
+
+# Response fields of each model; _id is always returned by Mongo
+PROPERTY_PROJECTION = {field: 1 for field in Property.model_fields if field != "id"}
+CONTACT_PROJECTION = {field: 1 for field in Contact.model_fields if field != "id"}
+
+# Defaults applied on the fast path for fields older documents may lack
+PROPERTY_DEFAULTS = {"imageUrl": "/api/placeholder/400/300", "gallery": [], "isActive": True}
+
+# Named field sets accepted by the fields= parameter of property and contact reads
+PROPERTY_VIEWS = {
+    "card": ("title", "location", "price", "imageUrl", "bedrooms"),
+    "detail": tuple(PROPERTY_PROJECTION),
+}
+CONTACT_VIEWS = {
+    "summary": ("name", "email", "subject", "isRead", "createdAt"),
+    "detail": tuple(CONTACT_PROJECTION),
+}
+
+def parse_fields(fields, views, projection):
+    """Resolve a comma-separated list of field and view names to a sorted tuple
+
+    Returns None when every field is selected, so full reads share one cache
+    entry whether or not fields= was given.
+    """
+    if fields is None:
+        return None
+    selected = set()
+    for name in fields.split(","):
+        name = name.strip()
+        if name in views:
+            selected.update(views[name])
+        elif name in projection:
+            selected.add(name)
+        elif name not in ("", "_id"):
+            raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+    return None if selected >= set(projection) else tuple(sorted(selected))
+
+def field_projection(fields, projection, *required):
+    """Mongo projection of the selected fields plus those the handler itself needs"""
+    if fields is None:
+        return projection
+    return {"_id": 1, **{field: 1 for field in (*fields, *required)}}
+
+def select_fields(doc, fields, defaults):
+    """Fill in defaults and trim a document to _id and the selected fields"""
+    doc = {**defaults, **doc}
+    if fields is None:
+        return doc
+    return {"_id": doc["_id"], **{field: doc[field] for field in fields if field in doc}}
+
+def orjson_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError
+
+def dump_json(value):
+    """Encode trusted Mongo documents as JSON bytes, bypassing model validation"""
+    started = time.perf_counter()
+    body = orjson.dumps(value, default=orjson_default)
+    metrics.observe("serialization_duration_seconds", (("encoder", "orjson"),), time.perf_counter() - started)
+    return body
+
+def encode_model(adapter, value):
+    """Validate value against a response model and encode it as JSON bytes"""
+    started = time.perf_counter()
+    body = adapter.dump_json(adapter.validate_python(value), by_alias=True)
+    metrics.observe("serialization_duration_seconds", (("encoder", "pydantic"),), time.perf_counter() - started)
+    return body
+
+# Supported content codings in order of preference
+COMPRESSORS = {"gzip": lambda body: gzip.compress(body, compresslevel=6)}
+if brotli is not None:
+    COMPRESSORS = {"br": lambda body: brotli.compress(body, quality=5), **COMPRESSORS}
+
+class CachedBody:
+    """Encoded JSON response body with its strong ETag and extra headers
+
+    Compressed variants are produced on first request for each coding and
+    kept alongside the body, so a content version is compressed only once.
+    """
+
+    __slots__ = ("body", "etag", "headers", "_compressed")
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.headers = headers or {}
+        self._compressed = {}
+
+    def compressed(self, coding):
+        body = self._compressed.get(coding)
+        if body is None:
+            body = self._compressed[coding] = COMPRESSORS[coding](self.body)
+        return body
+
+def negotiate_encoding(accept_encoding, size):
+    """Pick the preferred content coding the client accepts, or None for identity"""
+    if not accept_encoding or size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = set()
+    refused = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            (accepted if not params or float(q) > 0 else refused).add(coding.strip().lower())
+        except ValueError:
+            continue
+    # A wildcard only stands for codings the client did not name with q=0
+    return next((coding for coding in COMPRESSORS if coding not in refused
+                 and (coding in accepted or "*" in accepted)), None)
+
+def etag_matches(if_none_match, etag):
+    """Evaluate an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def cached_response(request, cached, cache_control, media_type="application/json"):
+    """Serve a CachedBody, compressed when negotiated, answering 304 when the client already holds it"""
+    coding = negotiate_encoding(request.headers.get("accept-encoding"), len(cached.body))
+    # Each coding is a distinct representation and needs its own strong ETag
+    etag = f'{cached.etag[:-1]}-{coding}"' if coding else cached.etag
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding", **cached.headers}
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    if coding:
+        headers["Content-Encoding"] = coding
+        return Response(cached.compressed(coding), media_type=media_type, headers=headers)
+    return Response(cached.body, media_type=media_type, headers=headers)
+
+# Property search: field weights of the in-memory inverted index
+SEARCH_FIELD_WEIGHTS = {"title": 3.0, "location": 2.0, "features": 2.0, "description": 1.0}
+SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+def fold_text(text):
+    """Case-fold with Turkish rules and strip diacritics, so that İ/ı/I/i,
+    ş/s, ğ/g, ö/o, ü/u, ç/c and accented Greek letters compare equal"""
+    text = text.replace("İ", "i").replace("I", "ı").lower()
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return text.replace("ı", "i")
+
+def tokenize(text):
+    return SEARCH_TOKEN_RE.findall(fold_text(text))
+
+class SearchIndex:
+    """Incrementally maintained inverted index over active properties
+
+    Postings map a folded token to {property id: field-weighted term count}.
+    The sorted vocabulary lets the last query term match as a prefix, which
+    keeps type-ahead queries such as "sant" useful.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._lock = asyncio.Lock()
+        self._generation = 0
+        self._postings = {}
+        self._doc_terms = {}
+        self._vocabulary = []
+
+    def add(self, doc):
+        doc_id = str(doc["_id"])
+        self.remove(doc_id)
+        weights = {}
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            value = doc.get(field) or ""
+            text = " ".join(value) if isinstance(value, list) else value
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+            postings[doc_id] = weight
+        self._doc_terms[doc_id] = list(weights)
+
+    def remove(self, doc_id):
+        for token in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[token]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def reset(self):
+        """Forget every document; the index is rebuilt on the next search"""
+        self.ready = False
+        self._generation += 1
+        self._postings, self._doc_terms, self._vocabulary = {}, {}, []
+
+    async def ensure_built(self):
+        if self.ready:
+            return
+        async with self._lock:
+            fields = {field: 1 for field in SEARCH_FIELD_WEIGHTS}
+            # A reset() while the cursor is being read empties the index under
+            # the build, so the build starts over from the new generation
+            while not self.ready:
+                generation = self._generation
+                async for doc in db.properties.find({"isActive": True}, fields):
+                    if self._generation != generation:
+                        break
+                    self.add(doc)
+                else:
+                    self.ready = self._generation == generation
+            logger.info(f"Search index built over {len(self._doc_terms)} properties")
+
+    def _expand(self, term, prefix):
+        if not prefix:
+            return [term] if term in self._postings else []
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\uffff")
+        return self._vocabulary[start:end]
+
+    def search(self, query, limit):
+        """Return up to limit (property id, score) pairs ranked by TF-IDF"""
+        terms = tokenize(query)
+        scores = {}
+        total = max(len(self._doc_terms), 1)
+        for position, term in enumerate(terms):
+            for token in self._expand(term, prefix=position == len(terms) - 1):
+                postings = self._postings[token]
+                idf = math.log(1 + total / len(postings))
+                for doc_id, weight in postings.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+search_index = SearchIndex()
+
+def reset_property_views():
+    """Drop every in-process view of the properties collection"""
+    invalidate_properties()
+    search_index.reset()
+
+def invalidate_company_info():
+    read_cache.invalidate("company_info")
+
+class CacheCoherence:
+    """Keeps per-process caches coherent across workers
+
+    Every write bumps a per-collection generation counter in the
+    cache_generations collection. Readers call refresh(), which re-reads the
+    counters at most once per interval and drops local caches of collections
+    whose generation moved, so remote writes become visible within roughly
+    one interval. With a change stream the counters are followed as they
+    change and polling is skipped.
+    """
+
+    def __init__(self, invalidators, interval):
+        self.invalidators = invalidators
+        self.interval = interval
+        self.streaming = False
+        self._known = {}
+        self._next_check = 0.0
+        self._watch_task = None
+
+    def _apply(self, name, generation):
+        if name in self._known and self._known[name] != generation:
+            self.invalidators[name]()
+        self._known[name] = generation
+
+    async def refresh(self):
+        now = time.monotonic()
+        if self.streaming or now < self._next_check:
+            return
+        # Claim the check before awaiting so concurrent readers skip it
+        self._next_check = now + self.interval
+        try:
+            generations = dict.fromkeys(self.invalidators, 0)
+            async for doc in db.cache_generations.find({"_id": {"$in": list(self.invalidators)}}):
+                generations[doc["_id"]] = doc["generation"]
+            for name, generation in generations.items():
+                self._apply(name, generation)
+        except Exception as e:
+            logger.warning(f"Error reading cache generations: {e}")
+
+    async def publish(self, name):
+        """Bump the generation of a collection after a local write"""
+        try:
+            doc = await db.cache_generations.find_one_and_update(
+                {"_id": name}, {"$inc": {"generation": 1}},
+                upsert=True, return_document=ReturnDocument.AFTER,
+            )
+            # Our own bump needs no invalidation; any gap means another worker wrote too
+            if self._known.get(name, 0) + 1 == doc["generation"]:
+                self._known[name] = doc["generation"]
+        except Exception as e:
+            logger.error(f"Error bumping cache generation of {name}: {e}")
+
+    def start(self):
+        if COHERENCE_CHANGE_STREAM:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    async def _watch(self):
+        try:
+            async with db.cache_generations.watch(full_document="updateLookup") as stream:
+                self.streaming = True
+                logger.info("Following cache generations through a change stream")
+                async for change in stream:
+                    doc = change.get("fullDocument")
+                    if doc and doc["_id"] in self.invalidators:
+                        self._apply(doc["_id"], doc["generation"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache generation change stream unavailable, polling instead: {e}")
+        finally:
+            self.streaming = False
+
+coherence = CacheCoherence(
+    {"properties": reset_property_views, "company_info": invalidate_company_info},
+    COHERENCE_INTERVAL,
+)
+
+class BatchWriter:
+    """Bounded write-behind queue flushed to a collection with insert_many
+
+    Documents must carry a pre-generated _id, which makes retried flushes
+    idempotent: duplicate key errors mean the document is already stored.
+    A failed flush is retried with capped backoff until it succeeds, while
+    the full queue blocks put() for up to enqueue_timeout and then raises
+    asyncio.TimeoutError so callers can shed load. Only at shutdown does a
+    batch that still fails after FLUSH_RETRIES attempts go to dead_letter_path.
+    """
+
+    FLUSH_RETRIES = 3
+    RETRY_BACKOFF_BASE = 0.5
+    RETRY_BACKOFF_MAX = 30.0
+
+    def __init__(self, collection, maxsize, batch_size, flush_interval, enqueue_timeout, dead_letter_path):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.dead_letter_path = Path(dead_letter_path)
+        self._queue = asyncio.Queue(maxsize)
+        self._closing = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._closing.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, doc):
+        await asyncio.wait_for(self._queue.put(doc), self.enqueue_timeout)
+
+    async def close(self):
+        """Flush everything queued so far and stop the worker"""
+        if self._task is None:
+            return
+        # Cuts short a retry backoff so shutdown is not held up by a down database
+        self._closing.set()
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            doc = await self._queue.get()
+            if doc is None:
+                break
+            batch = [doc]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    doc = await asyncio.wait_for(self._queue.get(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if doc is None:
+                    stopping = True
+                    break
+                batch.append(doc)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await db[self.collection].insert_many(batch, ordered=False)
+                return
+            except BulkWriteError as e:
+                if all(error["code"] == 11000 for error in e.details["writeErrors"]):
+                    return
+                logger.error(f"Error flushing {len(batch)} {self.collection} (attempt {attempt}): {e}")
+            except Exception as e:
+                logger.error(f"Error flushing {len(batch)} {self.collection} (attempt {attempt}): {e}")
+            if self._closing.is_set() and attempt >= self.FLUSH_RETRIES:
+                await asyncio.to_thread(self._dead_letter, batch)
+                return
+            delay = min(self.RETRY_BACKOFF_BASE * 2 ** attempt, self.RETRY_BACKOFF_MAX)
+            try:
+                await asyncio.wait_for(self._closing.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dead_letter(self, batch):
+        """Append unstored documents to the dead-letter file so they can be re-imported"""
+        try:
+            self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.dead_letter_path, "ab") as f:
+                for doc in batch:
+                    f.write(dump_json(doc) + b"\n")
+            logger.error(f"Wrote {len(batch)} unstored {self.collection} to {self.dead_letter_path}")
+        except OSError as e:
+            # Last resort: the full documents end up in the log rather than nowhere
+            logger.error(f"Could not write {self.dead_letter_path} ({e}); unstored {self.collection}: "
+                         f"{dump_json(batch).decode()}")
+
+contact_writer = BatchWriter(
+    "contacts", CONTACT_QUEUE_SIZE, CONTACT_BATCH_SIZE, CONTACT_FLUSH_INTERVAL, CONTACT_ENQUEUE_TIMEOUT,
+    CONTACT_DEAD_LETTER_PATH,
+) if CONTACT_WRITE_BEHIND else None
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate tokens per second up to burst"""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst, now):
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, rate, burst, now):
+        """Take a token; return 0 on success or the seconds until one is available"""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+class RateLimitPolicy:
+    """Per-client and global token buckets guarding one route
+
+    The global bucket defaults to RATE_LIMIT_GLOBAL_FACTOR times the per-client one.
+    """
+
+    def __init__(self, rate, burst, global_rate=None, global_burst=None):
+        self.rate = rate
+        self.burst = burst
+        self.global_rate = rate * RATE_LIMIT_GLOBAL_FACTOR if global_rate is None else global_rate
+        self.global_burst = burst * RATE_LIMIT_GLOBAL_FACTOR if global_burst is None else global_burst
+        self.counters = {"allowed": 0, "rejectedClient": 0, "rejectedGlobal": 0, "rejectedShared": 0}
+        self._clients = OrderedDict()
+        self._global = None
+
+    def check(self, client_key, now):
+        """Return 0 when the request may proceed, else the Retry-After delay"""
+        if self._global is None:
+            self._global = TokenBucket(self.global_burst, now)
+        bucket = self._clients.get(client_key)
+        if bucket is None:
+            bucket = self._clients[client_key] = TokenBucket(self.burst, now)
+            # Forgetting the least recent client only hands it a fresh bucket
+            if len(self._clients) > RATE_LIMIT_MAX_CLIENTS:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client_key)
+        wait = bucket.take(self.rate, self.burst, now)
+        if wait:
+            self.counters["rejectedClient"] += 1
+            return wait
+        wait = self._global.take(self.global_rate, self.global_burst, now)
+        if wait:
+            # Give the client its token back, the request was not served
+            bucket.tokens += 1
+            self.counters["rejectedGlobal"] += 1
+            return wait
+        self.counters["allowed"] += 1
+        return 0.0
+
+    def window_limits(self, window):
+        """Requests per window allowed by the shared backend, per client and overall"""
+        return self.burst + self.rate * window, self.global_burst + self.global_rate * window
+
+    def snapshot(self):
+        return {
+            "rate": self.rate, "burst": self.burst,
+            "globalRate": self.global_rate, "globalBurst": self.global_burst,
+            "trackedClients": len(self._clients),
+            **self.counters,
+        }
+
+RATE_LIMIT_GLOBAL_FACTOR = 10
+
+DEFAULT_RATE_LIMITS = {
+    "POST /api/contact": {"rate": 0.1, "burst": 5, "global_rate": 20, "global_burst": 100},
+    "POST /api/properties": {"rate": 0.5, "burst": 20, "global_rate": 5, "global_burst": 50},
+    # Each call can upsert thousands of listings
+    "POST /api/properties/import": {"rate": 1 / 60, "burst": 3, "global_rate": 0.1, "global_burst": 6},
+    # Each call writes up to IMAGE_MAX_BYTES and keeps an image worker busy
+    "POST /api/images": {"rate": 0.2, "burst": 10, "global_rate": 2, "global_burst": 30},
+}
+
+RATE_LIMIT_SETTINGS = {"rate", "burst", "global_rate", "global_burst"}
+
+def build_rate_limit_policies(defaults, overrides):
+    """Merge RATE_LIMITS overrides into the defaults, rejecting malformed entries by name"""
+    policies = {}
+    for route in {**defaults, **overrides}:
+        override = overrides.get(route, {})
+        if not isinstance(override, dict):
+            raise ValueError(f"RATE_LIMITS[{route!r}] must be an object")
+        unknown = set(override) - RATE_LIMIT_SETTINGS
+        if unknown:
+            raise ValueError(f"RATE_LIMITS[{route!r}] has unknown settings: {', '.join(sorted(unknown))}")
+        settings = {**defaults.get(route, {}), **override}
+        missing = {"rate", "burst"} - set(settings)
+        if missing:
+            raise ValueError(f"RATE_LIMITS[{route!r}] needs {' and '.join(sorted(missing))}")
+        for name, value in settings.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"RATE_LIMITS[{route!r}].{name} must be a non-negative number")
+            # A bucket that never refills would have no Retry-After to give
+            if name.endswith("rate") and value == 0:
+                raise ValueError(f"RATE_LIMITS[{route!r}].{name} must be greater than 0")
+        policies[route] = RateLimitPolicy(**settings)
+    return policies
+
+rate_limit_policies = build_rate_limit_policies(DEFAULT_RATE_LIMITS, RATE_LIMITS)
+
+class MongoRateLimitBackend:
+    """Fixed-window request counters in Mongo, shared by every worker
+
+    Consulted only for requests the local buckets already let through, so a
+    flooding client is still turned away without any I/O.
+    """
+
+    WINDOW = 60
+
+    async def check(self, route, client_key, policy, now):
+        window = int(now // self.WINDOW)
+        expires = datetime.utcfromtimestamp((window + 2) * self.WINDOW)
+        client_limit, global_limit = policy.window_limits(self.WINDOW)
+        for key, limit in ((f"{route}|{client_key}|{window}", client_limit), (f"{route}|*|{window}", global_limit)):
+            doc = await db.rate_limits.find_one_and_update(
+                {"_id": key}, {"$inc": {"count": 1}, "$setOnInsert": {"expiresAt": expires}},
+                upsert=True, return_document=ReturnDocument.AFTER,
+            )
+            if doc["count"] > limit:
+                policy.counters["rejectedShared"] += 1
+                return (window + 1) * self.WINDOW - now
+        return 0.0
+
+rate_limit_backend = MongoRateLimitBackend() if RATE_LIMIT_BACKEND == "mongo" else None
+
+class RateLimitMiddleware:
+    """ASGI middleware rejecting over-limit requests with 429 before routing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def client_key(self, scope):
+        if RATE_LIMIT_TRUST_PROXY:
+            # Repeated headers read as one comma-separated list, in order
+            forwarded = [
+                address.strip()
+                for name, value in scope["headers"] if name == b"x-forwarded-for"
+                for address in value.decode("latin-1").split(",")
+            ]
+            forwarded = [address for address in forwarded if address]
+            # Only the entries our own proxies appended can be trusted
+            if len(forwarded) >= RATE_LIMIT_PROXY_HOPS > 0:
+                return forwarded[-RATE_LIMIT_PROXY_HOPS]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            route = f"{scope['method']} {scope['path'].rstrip('/')}"
+            policy = rate_limit_policies.get(route)
+            if policy is not None:
+                client_key = self.client_key(scope)
+                # Wall-clock time so that shared windows line up across workers
+                now = time.time()
+                wait = policy.check(client_key, now)
+                if not wait and rate_limit_backend is not None:
+                    try:
+                        wait = await rate_limit_backend.check(route, client_key, policy, now)
+                    except Exception as e:
+                        logger.warning(f"Shared rate limit check failed for {route}: {e}")
+                if wait:
+                    response = Response(
+                        b'{"detail":"Too many requests"}', status_code=429, media_type="application/json",
+                        headers={"Retry-After": str(math.ceil(wait))},
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+# Hot copies of completed idempotent responses and of recent contact fingerprints
+idempotency_cache = TTLCache(IDEMPOTENCY_CACHE_ENTRIES, IDEMPOTENCY_TTL_SECONDS)
+recent_contacts = TTLCache(IDEMPOTENCY_CACHE_ENTRIES, CONTACT_DEDUPE_SECONDS)
+# Concurrent identical submissions (double taps) share one store, keyed by content hash
+contact_flight = SingleFlight()
+
+def request_fingerprint(payload):
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def replay_response(body):
+    return Response(body, media_type="application/json", headers={"Idempotent-Replayed": "true"})
+
+async def run_idempotent(request, route, payload, handler):
+    """Run handler at most once per Idempotency-Key and replay its response to retries
+
+    Keys are reserved in the TTL-indexed idempotency_keys collection before
+    the handler runs, so concurrent retries of an in-flight request get 409.
+    The reservation is a lease of IDEMPOTENCY_LEASE_SECONDS: if its holder
+    died or could not record the response, a retry takes the key over. A key
+    reused with a different payload gets 422. Failed requests release their
+    key so the client can retry. The handler may return encoded JSON bytes.
+    """
+    key = request.headers.get("idempotency-key")
+    if not key:
+        result = await handler()
+        return Response(result, media_type="application/json") if isinstance(result, bytes) else result
+    if len(key) > 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key too long")
+    
+    record_id = f"{route}|{key}"
+    fingerprint = request_fingerprint(payload)
+    cached = idempotency_cache.get(record_id)
+    if cached is None:
+        # Whole milliseconds, as stored by MongoDB, so the lease can be matched later
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        lease = now + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+        try:
+            await db.idempotency_keys.insert_one({
+                "_id": record_id,
+                "requestHash": fingerprint,
+                "state": "pending",
+                "lockedUntil": lease,
+                "expiresAt": now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            })
+        except DuplicateKeyError:
+            # Take over a pending reservation whose lease ran out
+            record = await db.idempotency_keys.find_one_and_update(
+                {"_id": record_id, "state": "pending", "requestHash": fingerprint,
+                 "lockedUntil": {"$not": {"$gt": now}}},
+                {"$set": {"lockedUntil": lease}},
+            )
+            if record is None:
+                record = await db.idempotency_keys.find_one({"_id": record_id})
+                if record is not None and record["requestHash"] != fingerprint:
+                    raise HTTPException(status_code=422, detail="Idempotency-Key was used with a different request")
+                if record is None or record["state"] == "pending":
+                    raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress",
+                                        headers={"Retry-After": "1"})
+                cached = (record["requestHash"], record["body"])
+                idempotency_cache.set(record_id, cached)
+    if cached is not None:
+        if cached[0] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was used with a different request")
+        return replay_response(cached[1])
+    
+    try:
+        result = await handler()
+        body = result if isinstance(result, bytes) else dump_json(result)
+    except BaseException:
+        # Matching our lease leaves a reservation taken over by a retry alone
+        await db.idempotency_keys.delete_one({"_id": record_id, "state": "pending", "lockedUntil": lease})
+        raise
+    try:
+        await db.idempotency_keys.update_one(
+            {"_id": record_id}, {"$set": {"state": "done", "body": body}, "$unset": {"lockedUntil": ""}}
+        )
+    except Exception as e:
+        logger.error(f"Error storing idempotent response for {record_id}: {e}")
+    idempotency_cache.set(record_id, (fingerprint, body))
+    return Response(body, media_type="application/json")
+
+def contact_fingerprint(contact):
+    """Hash of a submission's content, ignoring case and surrounding whitespace"""
+    fields = (contact.name, contact.email, contact.phone, contact.subject, contact.message)
+    return request_fingerprint([field.strip().casefold() for field in fields])
+
+async def find_recent_contact(content_hash):
+    """Return the id of an identical contact submitted within the dedupe window
+
+    With write-behind only this process's recent submissions are consulted,
+    so queueing a submission never waits on a MongoDB read.
+    """
+    contact_id = recent_contacts.get(content_hash)
+    if contact_id is None and contact_writer is None:
+        since = datetime.utcnow() - timedelta(seconds=CONTACT_DEDUPE_SECONDS)
+        duplicate = await db.contacts.find_one(
+            {"contentHash": content_hash, "createdAt": {"$gte": since}}, {"_id": 1}
+        )
+        if duplicate is not None:
+            contact_id = duplicate["_id"]
+    return contact_id
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, never by raw path, to bound cardinality
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe("http_request_duration_seconds",
+                            (("method", scope["method"]), ("route", route)), time.perf_counter() - started)
+            metrics.inc("http_requests_total",
+                        (("method", scope["method"]), ("route", route), ("status", str(status[0]))))
+
+async def monitor_event_loop_lag(interval=0.5):
+    """Record how late a periodic timer fires, a direct measure of event loop blocking"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        metrics.observe("event_loop_lag_seconds", (), max(loop.time() - expected, 0.0))
+
+# Indexes required by the API routes, ensured at startup
+INDEXES = {
+    "properties": [
+        IndexModel([("isActive", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)],
+                   name="active_created"),
+        IndexModel([("isActive", ASCENDING), ("type", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)],
+                   name="active_type_created"),
+        IndexModel([("isActive", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="active_price"),
+        IndexModel([("isActive", ASCENDING), ("sizeSqm", ASCENDING), ("_id", ASCENDING)], name="active_size"),
+        IndexModel([("isActive", ASCENDING), ("pricePerSqm", ASCENDING), ("_id", ASCENDING)],
+                   name="active_price_per_sqm"),
+        # Documents without coordinates are left out of a 2dsphere index
+        IndexModel([("geo", GEOSPHERE)], name="geo"),
+        IndexModel([("externalRef", ASCENDING)], name="external_ref", unique=True,
+                   partialFilterExpression={"externalRef": {"$type": "string"}}),
+    ],
+    "contacts": [
+        IndexModel([("createdAt", DESCENDING)], name="created_desc"),
+        IndexModel([("contentHash", ASCENDING), ("createdAt", DESCENDING)], name="content_hash_created"),
+    ],
+    "idempotency_keys": [
+        IndexModel([("expiresAt", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "rate_limits": [
+        IndexModel([("expiresAt", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+}
+
+async def ensure_indexes():
+    """Create any missing indexes declared in INDEXES
+
+    Every collection is attempted; a RuntimeError naming the ones that failed
+    is raised afterwards, so warm-up is retried until all indexes exist.
+    """
+    failed = []
+    for collection, indexes in INDEXES.items():
+        try:
+            names = await db[collection].create_indexes(indexes)
+            logger.info(f"Indexes ensured on {collection}: {', '.join(names)}")
+        except Exception as e:
+            logger.error(f"Error creating indexes on {collection}: {e}")
+            failed.append(collection)
+    if failed:
+        raise RuntimeError(f"Indexes missing on {', '.join(failed)}")
+
+# Representative query of each read route, used for explain() diagnostics
+ROUTE_QUERIES = {
+    "GET /properties": lambda: db.properties.find({"isActive": True}).sort(
+        [("createdAt", 1), ("_id", 1)]).limit(PROPERTY_PAGE_SIZE + 1),
+    "GET /properties?type": lambda: db.properties.find({"isActive": True, "type": "Villa"}).sort(
+        [("createdAt", 1), ("_id", 1)]).limit(PROPERTY_PAGE_SIZE + 1),
+    "GET /properties?sort=-size": lambda: db.properties.find(
+        {"isActive": True, "sizeSqm": {"$ne": None}}).sort([("sizeSqm", -1), ("_id", -1)]).limit(PROPERTY_PAGE_SIZE + 1),
+    "GET /properties?min_price_per_sqm&sort=pricePerSqm": lambda: db.properties.find(
+        {"isActive": True, "pricePerSqm": {"$gte": 3000, "$ne": None}}).sort(
+        [("pricePerSqm", 1), ("_id", 1)]).limit(PROPERTY_PAGE_SIZE + 1),
+    "GET /properties/{id}": lambda: db.properties.find({"_id": ObjectId(), "isActive": True}).limit(1),
+    "GET /contacts": lambda: db.contacts.find().sort("createdAt", -1).limit(100),
+    "GET /contacts/export": lambda: db.contacts.find({"_id": {"$gt": ObjectId()}}).sort("_id", 1),
+}
+
+def plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    # Slot-based engine plans nest the classic tree under queryPlan
+    for key in ("queryPlan", "inputStage"):
+        yield from plan_stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+async def check_query_plans():
+    """Explain each route query and report collection scans and in-memory sorts"""
+    report = {}
+    for route, build in ROUTE_QUERIES.items():
+        explained = await build().explain()
+        stages = list(plan_stages(explained.get("queryPlanner", {}).get("winningPlan")))
+        problems = [stage for stage in stages if stage in ("COLLSCAN", "SORT")]
+        report[route] = {"stages": stages, "problems": problems}
+    return report
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "Golden Citizen API - Yunanistan Golden Visa", "status": "active"}
 
+def properties_cache_key(limit=PROPERTY_PAGE_SIZE, cursor=None, type=None, location=None, min_price=None,
+                         max_price=None, bedrooms=None, min_bedrooms=None, min_size=None, max_size=None,
+                         min_price_per_sqm=None, max_price_per_sqm=None, point=None, radius_km=None,
+                         within=None, sort="created", fields=None):
+    """Read cache key of a property listing page; the defaults describe the landing page"""
+    near = (tuple(point), radius_km) if point else None
+    return ("properties", limit, cursor, type, location, min_price, max_price, bedrooms, min_bedrooms,
+            min_size, max_size, min_price_per_sqm, max_price_per_sqm, near, within, sort, fields)
+
 @api_router.get("/properties", response_model=List[Property])
-async def get_properties():
-    """Get all active properties for Golden Visa investment"""
+async def get_properties(
+    request: Request,
+    limit: int = Query(PROPERTY_PAGE_SIZE, ge=1, le=PROPERTY_PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    type: Optional[str] = None,
+    location: Optional[str] = None,
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    bedrooms: Optional[int] = Query(None, ge=0),
+    min_bedrooms: Optional[int] = Query(None, ge=0),
+    min_size: Optional[float] = Query(None, ge=0),
+    max_size: Optional[float] = Query(None, ge=0),
+    min_price_per_sqm: Optional[int] = Query(None, ge=0),
+    max_price_per_sqm: Optional[int] = Query(None, ge=0),
+    near: Optional[str] = None,
+    radius_km: float = Query(NEAR_RADIUS_KM, gt=0, le=NEAR_RADIUS_KM_MAX),
+    within: Optional[str] = None,
+    sort: str = "created",
+    fields: Optional[str] = None,
+):
+    """Get a page of active properties for Golden Visa investment
+
+    Pages are ordered by (createdAt, _id), or by price, size or pricePerSqm
+    (prefix "-" for descending) and _id. near=lat,lng limits results to
+    radius_km and orders them by distance; within=south,west,north,east limits
+    them to a map viewport. When more results exist, the cursor for the next
+    page is returned in the X-Next-Cursor header. fields= takes field names
+    and/or the "card" and "detail" views to trim each property.
+    """
+    if near is not None:
+        if sort not in ("created", "distance"):
+            raise HTTPException(status_code=400, detail="near results are ordered by distance")
+        sort = "distance"
+    elif sort == "distance" or sort not in PROPERTY_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort: {sort}")
+    point = parse_near(near) if near is not None else None
+    viewport = parse_within(within) if within is not None else None
+    query = build_property_query(type, location, min_price, max_price, bedrooms, min_bedrooms,
+                                 min_size, max_size, min_price_per_sqm, max_price_per_sqm, viewport, sort)
+    after = decode_cursor(cursor, sort) if cursor else None
+    fields = parse_fields(fields, PROPERTY_VIEWS, PROPERTY_PROJECTION)
+    key = properties_cache_key(limit, cursor, type, location, min_price, max_price, bedrooms, min_bedrooms,
+                               min_size, max_size, min_price_per_sqm, max_price_per_sqm, point, radius_km,
+                               within, sort, fields)
     try:
-        properties = await db.properties.find({"isActive": True}).to_list(100)
-        for prop in properties:
-            prop["_id"] = str(prop["_id"])
-        return properties
+        await coherence.refresh()
+        cached = await read_cache.get_or_load(
+            key, lambda: load_properties_body(query, limit, fields, sort, after, point, radius_km * 1000)
+        )
+        return cached_response(request, cached, PROPERTY_CACHE_CONTROL)
     except Exception as e:
         logger.error(f"Error fetching properties: {e}")
         raise HTTPException(status_code=500, detail="Error fetching properties")
 
+async def load_nearby(query, limit, projection, near, radius, after=None):
+    """Up to limit + 1 properties within radius meters of near, in (distance, _id) order
+
+    $geoNear already returns documents closest first, so $limit follows it
+    directly rather than a blocking $sort over everything in the radius. Only
+    documents at exactly the distance of the last one fetched may be missing
+    or out of _id order; that tie group alone is re-read, ordered by _id.
+    """
+    def pipeline(min_distance, max_distance, *stages):
+        geo_near = {"near": {"type": "Point", "coordinates": near}, "key": "geo", "spherical": True,
+                    "distanceField": "distance", "maxDistance": max_distance, "query": query}
+        if min_distance is not None:
+            geo_near["minDistance"] = min_distance
+        # A cursor resumes at its distance; ties at that distance are settled on _id
+        keyset = [{"$match": keyset_after(*after, "distance")}] if after else []
+        return [{"$geoNear": geo_near}, *keyset, *stages,
+                {"$limit": limit + 1}, {"$project": {**projection, "distance": 1}}]
+
+    def by_distance(doc):
+        return doc["distance"], doc["_id"]
+
+    properties = await db.properties.aggregate(
+        pipeline(after[0] if after else None, radius), maxTimeMS=MONGO_MAX_TIME_MS
+    ).to_list(limit + 1)
+    properties.sort(key=by_distance)
+    if len(properties) > limit and properties[limit - 1]["distance"] == properties[limit]["distance"]:
+        # The page ends inside a group of equidistant documents
+        boundary = properties[limit]["distance"]
+        ties = await db.properties.aggregate(
+            pipeline(boundary, boundary, {"$sort": {"_id": 1}}), maxTimeMS=MONGO_MAX_TIME_MS
+        ).to_list(limit + 1)
+        closer = [doc for doc in properties if doc["distance"] < boundary]
+        tied = {doc["_id"]: doc for doc in properties if doc["distance"] == boundary}
+        tied.update((doc["_id"], doc) for doc in ties)
+        properties = closer + sorted(tied.values(), key=by_distance)
+    return properties[:limit + 1]
+
+async def load_properties_page(query, limit, fields=None, sort="created", after=None, near=None, radius=None):
+    """Fetch one page of properties and the cursor of the page after it
+
+    after is the decoded cursor of the previous page. With near, a [lng, lat]
+    point, properties within radius meters are returned closest first, each
+    with its distance in meters.
+    """
+    sort_field, direction = PROPERTY_SORTS[sort]
+    # The sort field is always fetched since the next cursor is built from it
+    projection = field_projection(fields, PROPERTY_PROJECTION, sort_field)
+    # Fetch one extra document to learn whether another page exists
+    if near is not None:
+        properties = await load_nearby(query, limit, projection, near, radius, after)
+    else:
+        if after:
+            query = {**query, **keyset_after(*after, sort)}
+        properties = await db.properties.find(query, projection).sort(
+            [(sort_field, direction), ("_id", direction)]
+        ).limit(limit + 1).max_time_ms(MONGO_MAX_TIME_MS).to_list(limit + 1)
+    next_cursor = None
+    if len(properties) > limit:
+        properties = properties[:limit]
+        next_cursor = encode_cursor(properties[-1], sort)
+    page = [select_fields(prop, fields, PROPERTY_DEFAULTS) for prop in properties]
+    if near is not None:
+        for prop, doc in zip(page, properties):
+            prop["distance"] = round(doc["distance"], 1)
+    return page, next_cursor
+
+async def load_properties_body(query, limit, fields=None, sort="created", after=None, near=None, radius=None):
+    properties, next_cursor = await load_properties_page(query, limit, fields, sort, after, near, radius)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return CachedBody(dump_json(properties), headers)
+
+@api_router.get("/properties/search", response_model=List[Property])
+async def search_properties(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=PROPERTY_PAGE_SIZE_MAX),
+    fields: Optional[str] = None,
+):
+    """Full-text search over title, location, description and features, best match first"""
+    fields = parse_fields(fields, PROPERTY_VIEWS, PROPERTY_PROJECTION)
+    try:
+        await coherence.refresh()
+        await search_index.ensure_built()
+        ranked = search_index.search(q, limit)
+        if not ranked:
+            return Response(b"[]", media_type="application/json")
+        
+        ids = [ObjectId(doc_id) for doc_id, _ in ranked]
+        docs = await db.properties.find(
+            {"_id": {"$in": ids}, "isActive": True}, field_projection(fields, PROPERTY_PROJECTION)
+        ).max_time_ms(MONGO_MAX_TIME_MS).to_list(len(ids))
+        by_id = {str(doc["_id"]): doc for doc in docs}
+        properties = [
+            select_fields(by_id[doc_id], fields, PROPERTY_DEFAULTS) for doc_id, _ in ranked if doc_id in by_id
+        ]
+        return Response(dump_json(properties), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error searching properties for {q!r}: {e}")
+        raise HTTPException(status_code=500, detail="Error searching properties")
+
+@api_router.post("/properties/batch")
+async def get_properties_batch(batch: PropertyBatchRequest, fields: Optional[str] = None):
+    """Get several properties with one query, in the order their IDs were given
+
+    Each item carries a status: "ok" with the property, "invalid" for a
+    malformed ID or "not_found" for an unknown or inactive property.
+    """
+    fields = parse_fields(fields, PROPERTY_VIEWS, PROPERTY_PROJECTION)
+    try:
+        await coherence.refresh()
+        # Normalised to lowercase hex, which is how str(ObjectId) renders the found _ids
+        normalised = {
+            property_id: str(ObjectId(property_id)) for property_id in batch.ids if ObjectId.is_valid(property_id)
+        }
+        valid = set(normalised.values())
+        found = {}
+        if valid:
+            docs = await db.properties.find(
+                {"_id": {"$in": [ObjectId(property_id) for property_id in valid]}, "isActive": True},
+                field_projection(fields, PROPERTY_PROJECTION),
+            ).max_time_ms(MONGO_MAX_TIME_MS).to_list(len(valid))
+            found = {str(doc["_id"]): doc for doc in docs}
+        
+        items = []
+        for property_id in batch.ids:
+            if property_id not in normalised:
+                items.append({"id": property_id, "status": "invalid"})
+            elif normalised[property_id] not in found:
+                items.append({"id": property_id, "status": "not_found"})
+            else:
+                items.append({"id": property_id, "status": "ok", "property": select_fields(
+                    found[normalised[property_id]], fields, PROPERTY_DEFAULTS)})
+        return Response(dump_json({"items": items}), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error fetching property batch: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching properties")
+
+@api_router.get("/properties/facets")
+async def get_property_facets(request: Request):
+    """Get active property counts by type, location and Golden Visa price bucket"""
+    try:
+        await coherence.refresh()
+        cached = await read_cache.get_or_load(("facets",), load_property_facets_body)
+        return cached_response(request, cached, PROPERTY_CACHE_CONTROL)
+    except Exception as e:
+        logger.error(f"Error fetching property facets: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching property facets")
+
+async def load_property_facets_body():
+    """Compute every facet in a single $facet aggregation"""
+    top = PRICE_BUCKET_BOUNDARIES[-1]
+    pipeline = [
+        {"$match": {"isActive": True}},
+        {"$facet": {
+            "types": [
+                {"$group": {"_id": "$type", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ],
+            "locations": [
+                {"$group": {"_id": "$location", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ],
+            "priceBuckets": [{"$bucket": {
+                "groupBy": "$price",
+                "boundaries": PRICE_BUCKET_BOUNDARIES,
+                "default": top,
+                "output": {"count": {"$sum": 1}},
+            }}],
+            "total": [{"$count": "count"}],
+        }},
+    ]
+    result = (await db.properties.aggregate(pipeline, maxTimeMS=MONGO_MAX_TIME_MS).to_list(1))[0]
+    
+    # $bucket omits empty buckets; report every bucket so the sidebar layout is stable
+    bucket_counts = {bucket["_id"]: bucket["count"] for bucket in result["priceBuckets"]}
+    bounds = PRICE_BUCKET_BOUNDARIES + [None]
+    facets = {
+        "types": [{"value": item["_id"], "count": item["count"]} for item in result["types"]],
+        "locations": [{"value": item["_id"], "count": item["count"]} for item in result["locations"]],
+        "priceBuckets": [
+            {"min": low, "max": high, "count": bucket_counts.get(low, 0)}
+            for low, high in zip(bounds, bounds[1:])
+        ],
+        "total": result["total"][0]["count"] if result["total"] else 0,
+    }
+    return CachedBody(dump_json(facets))
+
 @api_router.get("/properties/{property_id}", response_model=Property)
-async def get_property(property_id: str):
+async def get_property(request: Request, property_id: str, fields: Optional[str] = None):
     """Get single property details"""
     try:
         if not ObjectId.is_valid(property_id):
             raise HTTPException(status_code=400, detail="Invalid property ID")
         
-        property = await db.properties.find_one({"_id": ObjectId(property_id), "isActive": True})
-        if not property:
-            raise HTTPException(status_code=404, detail="Property not found")
-        
-        property["_id"] = str(property["_id"])
-        return property
+        fields = parse_fields(fields, PROPERTY_VIEWS, PROPERTY_PROJECTION)
+        await coherence.refresh()
+        cached = await read_cache.get_or_load(
+            ("property", property_id, fields), lambda: load_property_body(property_id, fields)
+        )
+        return cached_response(request, cached, PROPERTY_CACHE_CONTROL)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching property {property_id}: {e}")
         raise HTTPException(status_code=500, detail="Error fetching property")
 
+async def load_property_body(property_id, fields=None):
+    property = await db.properties.find_one(
+        {"_id": ObjectId(property_id), "isActive": True}, field_projection(fields, PROPERTY_PROJECTION),
+        max_time_ms=MONGO_MAX_TIME_MS,
+    )
+    if not property:
+        raise HTTPException(status_code=404, detail="Property not found")
+    
+    return CachedBody(dump_json(select_fields(property, fields, PROPERTY_DEFAULTS)))
+
 @api_router.post("/properties", response_model=Property)
-async def create_property(property: PropertyCreate):
+async def create_property(request: Request, property: PropertyCreate):
     """Create a new property (admin use)"""
+    async def handler():
+        # Encoded through the model, so the body is the same with or without Idempotency-Key
+        return encode_model(property_adapter, await store_property(property))
+    
+    return await run_idempotent(request, "POST /api/properties", property.dict(), handler)
+
+async def store_property(property):
     try:
         property_dict = property.dict()
+        property_dict.update(property_metrics(property.price, property.size))
+        property_dict.update(property_geo(property_dict["coordinates"]))
         property_dict["createdAt"] = datetime.utcnow()
         property_dict["isActive"] = True
         
         result = await db.properties.insert_one(property_dict)
+        invalidate_properties()
+        # Also while a build is reading the collection, which may have passed this document
+        search_index.add(property_dict)
+        await coherence.publish("properties")
         property_dict["_id"] = str(result.inserted_id)
         return property_dict
     except Exception as e:
         logger.error(f"Error creating property: {e}")
         raise HTTPException(status_code=500, detail="Error creating property")
 
+@api_router.post("/properties/import")
+async def import_properties(request: Request):
+    """Upsert properties from an NDJSON body keyed by externalRef (admin use)
+
+    Each line is a PropertyImport object. Records are validated as the body
+    streams in and written with unordered bulk_write in IMPORT_CHUNK_SIZE
+    chunks; invalid or rejected records are reported by line number.
+    """
+    stats = {"received": 0, "upserted": 0, "matched": 0, "modified": 0, "failed": 0}
+    errors = []
+    
+    def record_error(line_no, error, external_ref=None):
+        stats["failed"] += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({"line": line_no, "externalRef": external_ref, "error": error})
+    
+    async def flush(chunk):
+        operations = [op for _, _, op in chunk]
+        try:
+            result = await db.properties.bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for error in details["writeErrors"]:
+                line_no, external_ref, _ = chunk[error["index"]]
+                record_error(line_no, error["errmsg"], external_ref)
+        stats["upserted"] += details["nUpserted"]
+        stats["matched"] += details["nMatched"]
+        stats["modified"] += details["nModified"]
+    
+    started = time.perf_counter()
+    chunk = []
+    try:
+        async for line_no, line in iter_ndjson_lines(request):
+            stats["received"] += 1
+            if line is None:
+                record_error(line_no, f"record: line longer than {IMPORT_MAX_LINE_BYTES} bytes")
+                continue
+            try:
+                record = PropertyImport.model_validate_json(line)
+            except ValidationError as e:
+                record_error(line_no, "; ".join(
+                    f"{'.'.join(map(str, error['loc'])) or 'record'}: {error['msg']}" for error in e.errors()
+                ))
+                continue
+            
+            fields = record.dict()
+            fields.update(property_metrics(record.price, record.size))
+            fields.update(property_geo(fields["coordinates"]))
+            chunk.append((line_no, record.externalRef, UpdateOne(
+                {"externalRef": record.externalRef},
+                {"$set": fields, "$setOnInsert": {"createdAt": datetime.utcnow(), "isActive": True}},
+                upsert=True,
+            )))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await flush(chunk)
+                chunk = []
+        if chunk:
+            await flush(chunk)
+    except Exception as e:
+        logger.error(f"Error importing properties after {stats['received']} records: {e}")
+        raise HTTPException(status_code=500, detail="Error importing properties")
+    finally:
+        if stats["upserted"] or stats["modified"]:
+            reset_property_views()
+            await coherence.publish("properties")
+    
+    elapsed = time.perf_counter() - started
+    logger.info(f"Imported {stats['received']} property records ({stats['failed']} failed) in {elapsed:.2f}s")
+    return {
+        **stats,
+        "errors": errors,
+        "errorsTruncated": stats["failed"] > len(errors),
+        "elapsedSeconds": round(elapsed, 3),
+        "recordsPerSecond": round(stats["received"] / elapsed, 1) if elapsed else None,
+    }
+
+async def iter_ndjson_lines(request, max_line_bytes=None):
+    """Yield (line number, bytes) for each non-blank line of a streamed request body
+
+    A line longer than max_line_bytes (IMPORT_MAX_LINE_BYTES by default) is not
+    buffered: it is skipped up to the next newline and yielded as (line number, None).
+    """
+    max_line_bytes = max_line_bytes or IMPORT_MAX_LINE_BYTES
+    pending = bytearray()
+    oversized = False
+    line_no = 0
+    async for data in request.stream():
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            piece = data[start:] if end == -1 else data[start:end]
+            if not oversized:
+                if len(pending) + len(piece) > max_line_bytes:
+                    oversized = True
+                    pending.clear()
+                else:
+                    pending += piece
+            if end == -1:
+                break
+            line_no += 1
+            if oversized:
+                yield line_no, None
+            elif pending.strip():
+                yield line_no, bytes(pending)
+            pending.clear()
+            oversized = False
+            start = end + 1
+    if oversized:
+        yield line_no + 1, None
+    elif pending.strip():
+        yield line_no + 1, bytes(pending)
+
 @api_router.post("/contact")
-async def submit_contact(contact: ContactCreate):
+async def submit_contact(request: Request, contact: ContactCreate):
     """Submit contact form"""
+    return await run_idempotent(request, "POST /api/contact", contact.dict(), lambda: store_contact(contact))
+
+async def store_contact(contact):
+    content_hash = contact_fingerprint(contact)
+    return await contact_flight.do(content_hash, lambda: store_new_contact(contact, content_hash))
+
+async def store_new_contact(contact, content_hash):
     try:
+        duplicate_id = await find_recent_contact(content_hash)
+        if duplicate_id is not None:
+            logger.info(f"Suppressed duplicate contact submission from {contact.name} ({contact.email})")
+            return contact_success(duplicate_id)
+        
         contact_dict = contact.dict()
         contact_dict["createdAt"] = datetime.utcnow()
         contact_dict["isRead"] = False
+        contact_dict["contentHash"] = content_hash
         
-        result = await db.contacts.insert_one(contact_dict)
+        if contact_writer is not None:
+            contact_dict["_id"] = ObjectId()
+            try:
+                await contact_writer.put(contact_dict)
+            except asyncio.TimeoutError:
+                raise HTTPException(status_code=503, detail="Contact queue is full, please retry",
+                                    headers={"Retry-After": "1"})
+            inserted_id = contact_dict["_id"]
+        else:
+            result = await db.contacts.insert_one(contact_dict)
+            inserted_id = result.inserted_id
         
+        recent_contacts.set(content_hash, inserted_id)
         logger.info(f"New contact submission from {contact.name} ({contact.email})")
         
-        return {
-            "success": True, 
-            "message": "İletişim formunuz başarıyla gönderildi. En kısa sürede size geri dönüş yapacağız.",
-            "id": str(result.inserted_id)
-        }
+        return contact_success(inserted_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting contact form: {e}")
         raise HTTPException(status_code=500, detail="Error submitting contact form")
 
+def contact_success(contact_id):
+    return {
+        "success": True, 
+        "message": "İletişim formunuz başarıyla gönderildi. En kısa sürede size geri dönüş yapacağız.",
+        "id": str(contact_id)
+    }
+
 @api_router.get("/contacts", response_model=List[Contact])
-async def get_contacts():
+async def get_contacts(fields: Optional[str] = None):
     """Get all contact submissions (admin use)"""
+    fields = parse_fields(fields, CONTACT_VIEWS, CONTACT_PROJECTION)
     try:
-        contacts = await db.contacts.find().sort("createdAt", -1).to_list(100)
-        for contact in contacts:
-            contact["_id"] = str(contact["_id"])
-        return contacts
+        contacts = await db.contacts.find({}, field_projection(fields, CONTACT_PROJECTION)).sort(
+            "createdAt", -1).max_time_ms(MONGO_MAX_TIME_MS).to_list(100)
+        return Response(dump_json(contacts), media_type="application/json")
     except Exception as e:
         logger.error(f"Error fetching contacts: {e}")
         raise HTTPException(status_code=500, detail="Error fetching contacts")
 
+# Column order of the contacts CSV export
+CONTACT_EXPORT_FIELDS = ["_id", "name", "email", "phone", "subject", "message", "isRead", "createdAt"]
+EXPORT_BATCH_SIZE = 500
+
+@api_router.get("/contacts/export")
+async def export_contacts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = None,
+    is_read: Optional[bool] = Query(None, alias="isRead"),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Stream contact submissions as NDJSON or CSV in _id order (admin use)
+
+    Pass the _id of the last exported contact as cursor to resume an
+    interrupted export.
+    """
+    fields = parse_fields(fields, CONTACT_VIEWS, CONTACT_PROJECTION)
+    query = {}
+    if since is not None:
+        query["createdAt"] = {"$gte": since}
+    if is_read is not None:
+        query["isRead"] = is_read
+    if cursor is not None:
+        if not ObjectId.is_valid(cursor):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$gt": ObjectId(cursor)}
+    
+    contacts = db.contacts.find(query, field_projection(fields, CONTACT_PROJECTION)).sort(
+        "_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    if format == "csv":
+        columns = [field for field in CONTACT_EXPORT_FIELDS if field == "_id" or fields is None or field in fields]
+        body, media_type = encode_contacts_csv(contacts, columns), "text/csv; charset=utf-8"
+    else:
+        body, media_type = encode_contacts_ndjson(contacts), "application/x-ndjson"
+    return StreamingResponse(
+        body, media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
+
+async def encode_contacts_ndjson(contacts):
+    chunk = []
+    async for contact in contacts:
+        chunk.append(dump_json(contact))
+        if len(chunk) == EXPORT_BATCH_SIZE:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+# Leading characters that make spreadsheet apps evaluate a cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def csv_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Contact fields are public input; quote would-be formulas so they stay text
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+async def encode_contacts_csv(contacts, columns=CONTACT_EXPORT_FIELDS):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    async for contact in contacts:
+        writer.writerow([csv_value(contact.get(field, "")) for field in columns])
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+@api_router.get("/health")
+async def health():
+    """Liveness: the process is serving; reports connection pool usage without touching MongoDB"""
+    return {"status": "ok", "ready": app_ready, "pool": mongo_pool.snapshot()}
+
+@api_router.get("/ready")
+async def ready():
+    """Readiness: warmed up and MongoDB answers a ping; 503 tells the load balancer to skip us
+
+    Warm-up is retried by a background task, so a probe costs one ping at most.
+    """
+    report = {"ready": app_ready, "pool": mongo_pool.snapshot()}
+    try:
+        started = time.perf_counter()
+        await client.admin.command("ping")
+        report["pingMs"] = round((time.perf_counter() - started) * 1000, 3)
+    except Exception as e:
+        logger.warning(f"Readiness ping failed: {e}")
+        report["ready"] = False
+        report["error"] = "MongoDB ping failed"
+    return Response(dump_json(report), status_code=200 if report["ready"] else 503,
+                    media_type="application/json", headers={"Cache-Control": "no-store"})
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Request, MongoDB, serialization and event loop metrics in Prometheus text format"""
+    cache_samples = []
+    for name, cache in (("read", read_cache), ("placeholder", placeholder_cache), ("idempotency", idempotency_cache)):
+        labels = (("cache", name),)
+        cache_samples += [
+            ("cache_hits_total", labels, cache.hits),
+            ("cache_misses_total", labels, cache.misses),
+            ("cache_entries", labels, len(cache)),
+        ]
+    return Response(metrics.render(cache_samples), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@api_router.get("/admin/rate-limits")
+async def get_rate_limits():
+    """Get rate limit policies and their counters in this worker (admin use)"""
+    return {
+        "backend": RATE_LIMIT_BACKEND,
+        "routes": {route: policy.snapshot() for route, policy in rate_limit_policies.items()},
+    }
+
+@api_router.get("/admin/query-plans")
+async def get_query_plans():
+    """Explain every route query and flag COLLSCAN / in-memory SORT stages (admin use)"""
+    try:
+        report = await check_query_plans()
+        return {"ok": not any(plan["problems"] for plan in report.values()), "routes": report}
+    except Exception as e:
+        logger.error(f"Error explaining query plans: {e}")
+        raise HTTPException(status_code=500, detail="Error explaining query plans")
+
 @api_router.get("/company-info", response_model=CompanyInfo)
-async def get_company_info():
+async def get_company_info(request: Request):
     """Get company and founder information"""
     try:
-        company_info = await db.company_info.find_one()
-        if not company_info:
-            # Return default company info if none exists
-            return await create_default_company_info()
-        
-        company_info["_id"] = str(company_info["_id"])
-        return company_info
+        await coherence.refresh()
+        cached = await read_cache.get_or_load(("company_info",), load_company_info_body)
+        return cached_response(request, cached, COMPANY_INFO_CACHE_CONTROL)
     except Exception as e:
         logger.error(f"Error fetching company info: {e}")
         raise HTTPException(status_code=500, detail="Error fetching company info")
 
+async def load_company_info():
+    """Fetch the company info document, creating the default one if none exists"""
+    company_info = await db.company_info.find_one(max_time_ms=MONGO_MAX_TIME_MS)
+    if not company_info:
+        # Return default company info if none exists
+        return await create_default_company_info()
+    
+    company_info["_id"] = str(company_info["_id"])
+    return company_info
+
+async def load_company_info_body():
+    return CachedBody(encode_model(company_info_adapter, await load_company_info()))
+
+# Fixed _id of the default company info, so concurrent creations upsert one document
+DEFAULT_COMPANY_INFO_ID = "default"
+
 async def create_default_company_info():
-    """Create default company information"""
+    """Create default company information, atomically if several requests race"""
     default_info = {
         "founder": {
             "name": "Ali İrfan Kaynak",
@@ -245,19 +2205,224 @@ async def create_default_company_info():
         "updatedAt": datetime.utcnow()
     }
     
-    result = await db.company_info.insert_one(default_info)
-    default_info["_id"] = str(result.inserted_id)
-    return default_info
+    try:
+        company_info = await db.company_info.find_one_and_update(
+            {"_id": DEFAULT_COMPANY_INFO_ID}, {"$setOnInsert": default_info},
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Another worker's upsert won the race on the _id index
+        company_info = await db.company_info.find_one({"_id": DEFAULT_COMPANY_INFO_ID})
+    company_info["_id"] = str(company_info["_id"])
+    return company_info
+
+@api_router.get("/placeholder/{width}/{height}")
+async def get_placeholder(request: Request, width: int, height: int):
+    """Render a placeholder SVG image of the given size"""
+    if not (1 <= width <= PLACEHOLDER_MAX_SIZE and 1 <= height <= PLACEHOLDER_MAX_SIZE):
+        raise HTTPException(status_code=400, detail="Invalid placeholder size")
+    
+    cached = placeholder_cache.get((width, height))
+    if cached is None:
+        font = max(min(width, height) // 8, 8)
+        cached = CachedBody(PLACEHOLDER_SVG.format(w=width, h=height, font=font).encode("utf-8"))
+        placeholder_cache.set((width, height), cached)
+    return cached_response(request, cached, IMMUTABLE_CACHE_CONTROL, media_type="image/svg+xml")
+
+# Accepted upload formats and the extension / media type they are stored under
+IMAGE_FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+}
+
+# Derivatives generated for every upload: name -> (longest side in px, format)
+IMAGE_VARIANTS = {
+    "thumb": (320, "JPEG"),
+    "medium": (960, "JPEG"),
+    "thumb-webp": (320, "WEBP"),
+    "medium-webp": (960, "WEBP"),
+}
+
+IMAGE_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+image_executor = None
+
+def media_dir(kind, image_id):
+    """Directory holding files of an image, sharded by the first byte of its hash"""
+    return MEDIA_ROOT / kind / image_id[:2]
+
+def variant_filename(image_id, name):
+    # The spec is part of the address, so changing a variant's size re-renders it
+    size, fmt = IMAGE_VARIANTS[name]
+    return f"{image_id}-{name}-{size}.{IMAGE_FORMATS[fmt][0]}"
+
+def write_atomically(path, write):
+    """Write a file through a uniquely named temp file in the same directory
+
+    Concurrent workers rendering the same image each get their own temp file;
+    the last os.replace wins with identical content.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+def render_image_variants(data, image_id):
+    """Store an original upload and render its variants (runs in a worker process)
+
+    Files are content-addressed, so work already done for identical bytes
+    is skipped. Returns the detected format and pixel size of the original.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        fmt = image.format
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format {fmt}")
+        
+        originals = media_dir("originals", image_id)
+        originals.mkdir(parents=True, exist_ok=True)
+        original = originals / f"{image_id}.{IMAGE_FORMATS[fmt][0]}"
+        if not original.exists():
+            write_atomically(original, lambda f: f.write(data))
+        
+        image = ImageOps.exif_transpose(image)
+        variants = media_dir("variants", image_id)
+        variants.mkdir(parents=True, exist_ok=True)
+        for name, (size, variant_fmt) in IMAGE_VARIANTS.items():
+            path = variants / variant_filename(image_id, name)
+            if path.exists():
+                continue
+            variant = image.copy()
+            variant.thumbnail((size, size))
+            if variant_fmt == "JPEG" and variant.mode != "RGB":
+                variant = variant.convert("RGB")
+            write_atomically(path, lambda f: variant.save(f, variant_fmt, quality=82))
+        return fmt, image.size
+
+def parse_range(header, size):
+    """Parse a single-range Range header into inclusive (start, end), or None to serve everything"""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start == "":
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+def read_file_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+async def serve_media_file(request, path, media_type, etag):
+    """Serve an immutable media file with ETag and single-range support"""
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        size = (await asyncio.to_thread(path.stat)).st_size
+        byte_range = parse_range(range_header, size)
+        if byte_range is not None:
+            start, end = byte_range
+            data = await asyncio.to_thread(read_file_range, path, start, end - start + 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return Response(data, status_code=206, media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+def image_urls(image_id):
+    return {
+        "original": f"/api/images/{image_id}",
+        "variants": {name: f"/api/images/{image_id}/{name}" for name in IMAGE_VARIANTS},
+    }
+
+@api_router.post("/images")
+async def upload_image(file: UploadFile = File(...)):
+    """Upload a gallery image and generate its resized variants (admin use)"""
+    global image_executor
+    data = await file.read(IMAGE_MAX_BYTES + 1)
+    if len(data) > IMAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    
+    image_id = hashlib.sha256(data).hexdigest()
+    if image_executor is None:
+        # Forking would copy Motor's running threads and locks into the workers
+        image_executor = ProcessPoolExecutor(
+            IMAGE_WORKERS, mp_context=multiprocessing.get_context("forkserver")
+        )
+    executor = image_executor
+    try:
+        loop = asyncio.get_running_loop()
+        fmt, (width, height) = await loop.run_in_executor(executor, render_image_variants, data, image_id)
+    except (ValueError, Image.UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
+    except BrokenProcessPool as e:
+        # A worker died (e.g. OOM-killed); a broken pool never recovers, so the
+        # next upload starts a fresh one
+        logger.error(f"Image worker died processing {file.filename}: {e}")
+        executor.shutdown(wait=False, cancel_futures=True)
+        if image_executor is executor:
+            image_executor = None
+        raise HTTPException(status_code=500, detail="Error processing image")
+    except Exception as e:
+        logger.error(f"Error processing image upload {file.filename}: {e}")
+        raise HTTPException(status_code=500, detail="Error processing image")
+    
+    return {"id": image_id, "format": fmt, "width": width, "height": height, **image_urls(image_id)}
+
+@api_router.get("/images/{image_id}")
+async def get_image(request: Request, image_id: str):
+    """Serve an uploaded original image"""
+    if not IMAGE_ID_RE.match(image_id):
+        raise HTTPException(status_code=400, detail="Invalid image ID")
+    
+    for fmt, (ext, media_type) in IMAGE_FORMATS.items():
+        path = media_dir("originals", image_id) / f"{image_id}.{ext}"
+        if await asyncio.to_thread(path.exists):
+            return await serve_media_file(request, path, media_type, f'"{image_id}"')
+    raise HTTPException(status_code=404, detail="Image not found")
+
+@api_router.get("/images/{image_id}/{variant}")
+async def get_image_variant(request: Request, image_id: str, variant: str):
+    """Serve a resized variant of an uploaded image"""
+    if not IMAGE_ID_RE.match(image_id) or variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=400, detail="Invalid image variant")
+    
+    filename = variant_filename(image_id, variant)
+    path = media_dir("variants", image_id) / filename
+    if not await asyncio.to_thread(path.exists):
+        raise HTTPException(status_code=404, detail="Image not found")
+    media_type = IMAGE_FORMATS[IMAGE_VARIANTS[variant][1]][1]
+    return await serve_media_file(request, path, media_type, f'"{filename}"')
 
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Configure logging
@@ -267,6 +2432,86 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+loop_lag_task = None
+warm_up_task = None
+app_ready = False
+
+@app.on_event("startup")
+async def start_background_workers():
+    if contact_writer is not None:
+        contact_writer.start()
+    coherence.start()
+    global loop_lag_task
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+@app.on_event("startup")
+async def warm_up():
+    """Open pool connections and prime the landing page caches before reporting ready
+
+    When MongoDB is unreachable the app starts unready and a background task
+    retries every WARMUP_RETRY_SECONDS until warm-up succeeds.
+    """
+    global warm_up_task
+    if not await try_warm_up():
+        warm_up_task = asyncio.create_task(retry_warm_up())
+
+async def try_warm_up():
+    global app_ready
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(MONGO_WARMUP_CONNECTIONS)))
+        # The TTL and unique indexes are part of being ready, not just the read indexes
+        await ensure_indexes()
+        # Record the current cache generations first, so writes by other
+        # workers after this point invalidate what is primed below
+        await coherence.refresh()
+        await read_cache.get_or_load(("company_info",), load_company_info_body)
+        query = build_property_query()
+        await read_cache.get_or_load(
+            properties_cache_key(), lambda: load_properties_body(query, PROPERTY_PAGE_SIZE)
+        )
+        app_ready = True
+        logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms "
+                    f"with {mongo_pool.open} open connections")
+        return True
+    except Exception as e:
+        # Stay up but unready; /api/ready reports 503 until a retry succeeds
+        logger.error(f"Warm-up failed: {e}")
+        return False
+
+async def retry_warm_up():
+    while True:
+        await asyncio.sleep(WARMUP_RETRY_SECONDS)
+        if await try_warm_up():
+            return
+
+@app.on_event("startup")
+async def check_startup_query_plans():
+    """Explain the route queries once warm-up has created the indexes"""
+    if QUERY_PLAN_CHECK not in ("warn", "strict"):
+        return
+    try:
+        report = await check_query_plans()
+    except Exception as e:
+        if QUERY_PLAN_CHECK == "strict":
+            raise
+        logger.error(f"Error checking query plans: {e}")
+        return
+    offending = {route: plan["problems"] for route, plan in report.items() if plan["problems"]}
+    for route, problems in offending.items():
+        logger.warning(f"Query plan for {route} uses {', '.join(problems)}")
+    if offending and QUERY_PLAN_CHECK == "strict":
+        raise RuntimeError(f"Unindexed query plans: {offending}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if loop_lag_task is not None:
+        loop_lag_task.cancel()
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    await coherence.stop()
+    if contact_writer is not None:
+        await contact_writer.close()
+    if image_executor is not None:
+        image_executor.shutdown()
     client.close()
@@ -160,6 +160,65 @@ class BackendTester:
         self.test_api_endpoint("GET", "/properties/507f1f77bcf86cd799439011", expected_status=404,
                              test_name="Non-existent Property ID")
     
+    def test_properties_pagination(self):
+        """Test cursor pagination and filters on GET /api/properties"""
+        self.log("=== Testing Property Pagination ===")
+        
+        self.results["total_tests"] += 1
+        try:
+            seen = []
+            cursor = None
+            while True:
+                params = {"limit": 2}
+                if cursor:
+                    params["cursor"] = cursor
+                response = requests.get(f"{BASE_URL}/properties", params=params, timeout=TIMEOUT)
+                response.raise_for_status()
+                seen.extend(prop["_id"] for prop in response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+            
+            if len(seen) == len(set(seen)):
+                self.log(f"Cursor pagination PASSED: {len(seen)} properties without duplicates", "SUCCESS")
+                self.results["passed"] += 1
+            else:
+                self.log("Cursor pagination FAILED: duplicate properties across pages", "ERROR")
+                self.results["failed"] += 1
+                self.results["errors"].append("Cursor pagination returned duplicates")
+        except requests.exceptions.RequestException as e:
+            self.log(f"Cursor pagination FAILED: {e}", "ERROR")
+            self.results["failed"] += 1
+            self.results["errors"].append(f"Cursor pagination error: {e}")
+        
+        filtered = self.test_api_endpoint("GET", "/properties?type=Villa&min_price=400000",
+                                          test_name="Filtered Properties")
+        if filtered is not None:
+            if all(p["type"] == "Villa" and p["price"] >= 400000 for p in filtered):
+                self.log("Property filter validation PASSED", "SUCCESS")
+            else:
+                self.log("Property filter validation FAILED", "ERROR")
+                self.results["errors"].append("Property filters returned non-matching properties")
+        
+        self.test_api_endpoint("GET", "/properties?cursor=not-a-cursor", expected_status=400,
+                             test_name="Invalid Pagination Cursor")
+    
+    def test_property_search(self):
+        """Test full-text search on GET /api/properties/search"""
+        self.log("=== Testing Property Search ===")
+        
+        # Turkish dotless ı and upper case must still match "Atina"
+        results = self.test_api_endpoint("GET", "/properties/search?q=ATINA", test_name="Search Properties")
+        if results is not None:
+            if all("atina" in f"{p['title']} {p['location']} {p['description']}".lower() for p in results):
+                self.log(f"Search result validation PASSED: {len(results)} matches", "SUCCESS")
+            else:
+                self.log("Search result validation FAILED", "ERROR")
+                self.results["errors"].append("Search returned properties not mentioning the query")
+        
+        self.test_api_endpoint("GET", "/properties/search", expected_status=422,
+                             test_name="Search Without Query")
+    
     def test_contact_api(self):
         """Test Contact Form API endpoints"""
         self.log("=== Testing Contact Form API ===")
@@ -357,6 +416,8 @@ class BackendTester:
         # Run all test suites
         self.test_root_endpoint()
         self.test_properties_api()
+        self.test_properties_pagination()
+        self.test_property_search()
         self.test_contact_api()
         self.test_company_info_api()
         self.test_error_handling()
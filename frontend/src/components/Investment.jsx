@@ -8,31 +8,71 @@ import axios from 'axios';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// One page of listings; filters are applied by the API, not in the browser.
+// No limit: the server's default page size is the one warm-up primes
+const fetchPropertiesPage = async (type, cursor) => {
+  const params = {
+    ...(type ? { type } : {}),
+    ...(cursor ? { cursor } : {}),
+  };
+  const response = await axios.get(`${API}/properties`, { params });
+  return { items: response.data, cursor: response.headers['x-next-cursor'] || null };
+};
+
 const Investment = () => {
   const [selectedProperty, setSelectedProperty] = useState(null);
   const [favorites, setFavorites] = useState([]);
   const [properties, setProperties] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [typeFilter, setTypeFilter] = useState('');
+  const [types, setTypes] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
-  // Fetch properties from API
+  // Property types for the filter buttons
   useEffect(() => {
+    axios.get(`${API}/properties/facets`)
+      .then((response) => setTypes(response.data.types))
+      .catch((err) => console.error('Error fetching property facets:', err));
+  }, []);
+
+  // Fetch the first page whenever the filter changes
+  useEffect(() => {
+    let cancelled = false;
     const fetchProperties = async () => {
       try {
         setLoading(true);
-        const response = await axios.get(`${API}/properties`);
-        setProperties(response.data);
+        const page = await fetchPropertiesPage(typeFilter, null);
+        if (cancelled) return;
+        setProperties(page.items);
+        setNextCursor(page.cursor);
         setError(null);
       } catch (err) {
+        if (cancelled) return;
         console.error('Error fetching properties:', err);
         setError('Emlak bilgileri yüklenirken bir hata oluştu.');
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     fetchProperties();
-  }, []);
+    return () => { cancelled = true; };
+  }, [typeFilter]);
+
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await fetchPropertiesPage(typeFilter, nextCursor);
+      setProperties(prev => [...prev, ...page.items]);
+      setNextCursor(page.cursor);
+    } catch (err) {
+      console.error('Error fetching more properties:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const toggleFavorite = (propertyId) => {
     setFavorites(prev => 
@@ -81,6 +121,22 @@ const Investment = () => {
           </p>
         </div>
 
+        {/* Type Filter */}
+        {types.length > 1 && (
+          <div className="flex flex-wrap justify-center gap-2 mb-8">
+            {[{ value: '', label: 'Tümü' }, ...types.map(({ value }) => ({ value, label: value }))].map(({ value, label }) => (
+              <Button
+                key={value || 'all'}
+                onClick={() => setTypeFilter(value)}
+                variant={typeFilter === value ? 'default' : 'outline'}
+                className={typeFilter === value ? 'bg-blue-900 hover:bg-blue-800 text-white' : 'text-blue-900 border-blue-200 hover:bg-blue-50'}
+              >
+                {label}
+              </Button>
+            ))}
+          </div>
+        )}
+
         {/* Properties Grid */}
         {loading ? (
           <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-8 mb-12">
@@ -261,6 +317,20 @@ const Investment = () => {
           </div>
         )}
 
+        {/* Next page on demand, following the X-Next-Cursor header */}
+        {!loading && !error && nextCursor && (
+          <div className="text-center -mt-4 mb-12">
+            <Button
+              onClick={loadMore}
+              disabled={loadingMore}
+              variant="outline"
+              className="text-blue-900 border-blue-200 hover:bg-blue-50"
+            >
+              {loadingMore ? 'Yükleniyor...' : 'Daha Fazla Göster'}
+            </Button>
+          </div>
+        )}
+
         {/* Investment Benefits */}
         <div className="bg-white rounded-2xl p-8 shadow-lg border border-blue-100">
           <div className="grid md:grid-cols-2 gap-8 items-center">
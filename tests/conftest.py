@@ -0,0 +1,46 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# server.py connects lazily, so any URL lets the tests import it
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'golden_citizen_test')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """Point server.py at an empty in-memory Mongo stand-in with cold caches"""
+    from mongomock_motor import AsyncMongoMockClient
+    import server
+
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", client[os.environ['DB_NAME']])
+    for cache in (server.read_cache, server.idempotency_cache, server.recent_contacts):
+        cache.invalidate()
+    return server.db
+
+
+@pytest.fixture
+def api(mock_db, monkeypatch):
+    """Test client with fresh rate limit buckets, so tests do not drain each other's"""
+    from fastapi.testclient import TestClient
+    import server
+
+    monkeypatch.setattr(server, "rate_limit_policies",
+                        server.build_rate_limit_policies(server.DEFAULT_RATE_LIMITS, server.RATE_LIMITS))
+    return TestClient(server.app)
+
+
+@pytest.fixture
+def new_property():
+    """A valid POST /api/properties body"""
+    return {
+        "title": "Kolonaki Daire", "location": "Kolonaki, Atina", "price": 300000, "type": "Daire",
+        "size": "90 m²", "bedrooms": 2, "bathrooms": 1, "features": [], "description": "Merkezi konum",
+        "coordinates": {"lat": 37.9795, "lng": 23.7442},
+    }
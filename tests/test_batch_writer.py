@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+from bson import ObjectId
+
+import server
+
+
+def contact(name):
+    return {"_id": ObjectId(), "name": name, "email": f"{name}@example.com", "message": "Merhaba"}
+
+
+def writer(tmp_path, batch_size=100, flush_interval=60):
+    return server.BatchWriter("contacts", 10, batch_size, flush_interval, 1, tmp_path / "dead.ndjson")
+
+
+def test_full_batch_is_flushed_without_waiting(mock_db, tmp_path):
+    async def run():
+        batch_writer = writer(tmp_path, batch_size=2)
+        batch_writer.start()
+        await batch_writer.put(contact("a"))
+        await batch_writer.put(contact("b"))
+        for _ in range(50):
+            if await mock_db.contacts.count_documents({}) == 2:
+                break
+            await asyncio.sleep(0.01)
+        stored = await mock_db.contacts.count_documents({})
+        await batch_writer.close()
+        return stored
+
+    assert asyncio.run(run()) == 2
+
+
+def test_partial_batch_is_flushed_after_the_interval(mock_db, tmp_path):
+    async def run():
+        batch_writer = writer(tmp_path, flush_interval=0.05)
+        batch_writer.start()
+        await batch_writer.put(contact("a"))
+        before = await mock_db.contacts.count_documents({})
+        await asyncio.sleep(0.2)
+        after = await mock_db.contacts.count_documents({})
+        await batch_writer.close()
+        return before, after
+
+    assert asyncio.run(run()) == (0, 1)
+
+
+def test_close_drains_the_queue(mock_db, tmp_path):
+    async def run():
+        batch_writer = writer(tmp_path)
+        batch_writer.start()
+        for name in "abc":
+            await batch_writer.put(contact(name))
+        await batch_writer.close()
+        return await mock_db.contacts.count_documents({})
+
+    assert asyncio.run(run()) == 3
+
+
+class FailingCollection:
+    def __init__(self, failures):
+        self.failures = failures
+        self.stored = []
+
+    async def insert_many(self, docs, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("no primary")
+        self.stored += docs
+
+
+def test_failed_flush_is_retried_until_it_succeeds(monkeypatch, tmp_path):
+    collection = FailingCollection(failures=5)
+    monkeypatch.setattr(server, "db", {"contacts": collection})
+    monkeypatch.setattr(server.BatchWriter, "RETRY_BACKOFF_BASE", 0.001)
+
+    async def run():
+        batch_writer = writer(tmp_path, batch_size=1)
+        batch_writer.start()
+        await batch_writer.put(contact("a"))
+        for _ in range(100):
+            if collection.stored:
+                break
+            await asyncio.sleep(0.01)
+        await batch_writer.close()
+
+    asyncio.run(run())
+    assert [doc["name"] for doc in collection.stored] == ["a"]
+    assert not (tmp_path / "dead.ndjson").exists()
+
+
+def test_unstored_batch_goes_to_dead_letter_at_shutdown(monkeypatch, tmp_path):
+    collection = FailingCollection(failures=1000)
+    monkeypatch.setattr(server, "db", {"contacts": collection})
+    monkeypatch.setattr(server.BatchWriter, "RETRY_BACKOFF_BASE", 0.001)
+    docs = [contact("a"), contact("b")]
+
+    async def run():
+        batch_writer = writer(tmp_path)
+        batch_writer.start()
+        for doc in docs:
+            await batch_writer.put(doc)
+        await batch_writer.close()
+
+    asyncio.run(run())
+    lines = [json.loads(line) for line in (tmp_path / "dead.ndjson").read_bytes().splitlines()]
+    assert lines == [json.loads(server.dump_json(doc)) for doc in docs]
+    assert lines[0]["email"] == "a@example.com" and lines[0]["message"] == "Merhaba"
@@ -0,0 +1,44 @@
+import asyncio
+
+import server
+
+
+def test_concurrent_misses_share_one_load():
+    cache = server.TTLCache(10, 60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load(("r", 1), loader) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_reads_after_invalidate_do_not_join_an_older_load():
+    cache = server.TTLCache(10, 60)
+    release = None
+
+    async def old_loader():
+        await release.wait()
+        return "old"
+
+    async def new_loader():
+        return "new"
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        stale = asyncio.ensure_future(cache.get_or_load(("r", 1), old_loader))
+        await asyncio.sleep(0)
+        cache.invalidate("r")
+        fresh = await cache.get_or_load(("r", 1), new_loader)
+        release.set()
+        return await stale, fresh
+
+    assert asyncio.run(run()) == ("old", "new")
+    assert cache.get(("r", 1)) == "new"
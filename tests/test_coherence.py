@@ -0,0 +1,165 @@
+import asyncio
+
+import server
+
+
+class Worker:
+    """A CacheCoherence as one worker process would hold it, counting invalidations"""
+
+    def __init__(self, interval=0):
+        self.invalidated = {"properties": 0, "company_info": 0}
+        self.coherence = server.CacheCoherence(
+            {name: (lambda name=name: self.bump(name)) for name in self.invalidated}, interval)
+
+    def bump(self, name):
+        self.invalidated[name] += 1
+
+
+def test_first_observation_never_invalidates(mock_db):
+    async def run():
+        await mock_db.cache_generations.insert_one({"_id": "properties", "generation": 7})
+        worker = Worker()
+        await worker.coherence.refresh()
+        return worker
+
+    worker = asyncio.run(run())
+    assert worker.invalidated == {"properties": 0, "company_info": 0}
+    assert worker.coherence._known == {"properties": 7, "company_info": 0}
+
+
+def test_another_workers_bump_invalidates(mock_db):
+    async def run():
+        ours, theirs = Worker(), Worker()
+        await ours.coherence.refresh()
+        await theirs.coherence.publish("properties")
+        await ours.coherence.refresh()
+        await ours.coherence.refresh()
+        return ours
+
+    assert asyncio.run(run()).invalidated == {"properties": 1, "company_info": 0}
+
+
+def test_own_bump_does_not_invalidate_again(mock_db):
+    async def run():
+        worker = Worker()
+        await worker.coherence.refresh()
+        await worker.coherence.publish("properties")
+        await worker.coherence.publish("company_info")
+        await worker.coherence.refresh()
+        return worker
+
+    assert asyncio.run(run()).invalidated == {"properties": 0, "company_info": 0}
+
+
+def test_publish_after_a_remote_bump_still_invalidates(mock_db):
+    async def run():
+        ours, theirs = Worker(), Worker()
+        await ours.coherence.refresh()
+        await theirs.coherence.publish("properties")
+        # Our bump lands on generation 2, so the gap shows another worker wrote first
+        await ours.coherence.publish("properties")
+        await ours.coherence.refresh()
+        return ours
+
+    assert asyncio.run(run()).invalidated["properties"] == 1
+
+
+def test_refresh_is_throttled_to_the_interval(mock_db, monkeypatch):
+    reads = []
+    find = type(mock_db.cache_generations).find
+
+    def counting_find(self, *args, **kwargs):
+        reads.append(1)
+        return find(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(mock_db.cache_generations), "find", counting_find)
+
+    async def run():
+        ours, theirs = Worker(interval=0.2), Worker()
+        await ours.coherence.refresh()
+        await theirs.coherence.publish("properties")
+        await asyncio.gather(*(ours.coherence.refresh() for _ in range(5)))
+        within_interval = (len(reads), ours.invalidated["properties"])
+        await asyncio.sleep(0.25)
+        await ours.coherence.refresh()
+        return within_interval, (len(reads), ours.invalidated["properties"])
+
+    assert asyncio.run(run()) == ((1, 0), (2, 1))
+
+
+def test_change_stream_failure_falls_back_to_polling(mock_db, monkeypatch):
+    def no_change_streams(self, *args, **kwargs):
+        raise RuntimeError("change streams need a replica set")
+
+    monkeypatch.setattr(server, "COHERENCE_CHANGE_STREAM", True)
+    monkeypatch.setattr(type(mock_db.cache_generations), "watch", no_change_streams, raising=False)
+
+    async def run():
+        ours, theirs = Worker(), Worker()
+        ours.coherence.start()
+        await ours.coherence._watch_task
+        await ours.coherence.refresh()
+        await theirs.coherence.publish("company_info")
+        await ours.coherence.refresh()
+        return ours
+
+    worker = asyncio.run(run())
+    assert worker.coherence.streaming is False
+    assert worker.invalidated == {"properties": 0, "company_info": 1}
+
+
+class FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.changes:
+            raise StopAsyncIteration
+        await asyncio.sleep(0)
+        return self.changes.pop(0)
+
+
+def test_change_stream_applies_generations_and_skips_polling(mock_db, monkeypatch):
+    changes = [
+        {"fullDocument": {"_id": "properties", "generation": 1}},
+        {"fullDocument": {"_id": "unrelated", "generation": 9}},
+        {"fullDocument": {"_id": "properties", "generation": 2}},
+    ]
+    monkeypatch.setattr(server, "COHERENCE_CHANGE_STREAM", True)
+    monkeypatch.setattr(type(mock_db.cache_generations), "watch",
+                        lambda self, **kwargs: FakeChangeStream(changes), raising=False)
+
+    async def run():
+        worker = Worker()
+        worker.coherence.start()
+        streaming = []
+        while worker.coherence._watch_task and not worker.coherence._watch_task.done():
+            streaming.append(worker.coherence.streaming)
+            await asyncio.sleep(0)
+        return worker, streaming
+
+    worker, streaming = asyncio.run(run())
+    assert True in streaming
+    assert worker.invalidated == {"properties": 1, "company_info": 0}
+
+
+def test_remote_write_drops_cached_listings(api, mock_db, monkeypatch):
+    monkeypatch.setattr(server.coherence, "_known", {})
+    monkeypatch.setattr(server.coherence, "_next_check", 0.0)
+    monkeypatch.setattr(server.coherence, "interval", 0)
+    assert api.get("/api/properties").status_code == 200
+    assert server.properties_cache_key() in server.read_cache._entries
+    # Another worker wrote a property and bumped the generation
+    asyncio.run(mock_db.cache_generations.update_one(
+        {"_id": "properties"}, {"$inc": {"generation": 1}}, upsert=True))
+    asyncio.run(server.coherence.refresh())
+    assert server.properties_cache_key() not in server.read_cache._entries
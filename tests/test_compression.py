@@ -0,0 +1,26 @@
+import pytest
+
+import server
+
+LARGE = server.COMPRESS_MIN_BYTES
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(server, "COMPRESSORS", {"br": bytes, "gzip": bytes})
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br;q=0, *", "gzip"),
+    ("br;q=0, gzip;q=0, *", None),
+    ("*", "br"),
+    ("gzip, br", "br"),
+    ("gzip;q=0.5, br;q=0", "gzip"),
+    ("identity", None),
+])
+def test_negotiate_encoding(with_brotli, header, expected):
+    assert server.negotiate_encoding(header, LARGE) == expected
+
+
+def test_small_bodies_are_not_compressed(with_brotli):
+    assert server.negotiate_encoding("gzip, br", LARGE - 1) is None
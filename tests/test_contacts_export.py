@@ -0,0 +1,42 @@
+import asyncio
+import csv
+import io
+from datetime import datetime
+
+import server
+
+
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks]).decode("utf-8")
+
+
+async def as_cursor(docs):
+    for doc in docs:
+        yield doc
+
+
+def export_rows(docs, columns=server.CONTACT_EXPORT_FIELDS):
+    text = asyncio.run(collect(server.encode_contacts_csv(as_cursor(docs), columns)))
+    return list(csv.reader(io.StringIO(text)))
+
+
+def test_csv_value_escapes_formula_prefixes():
+    for value in ("=HYPERLINK(\"http://x\")", "+1+1", "-2+3", "@SUM(A1)", "\tx", "\rx"):
+        assert server.csv_value(value) == "'" + value
+
+
+def test_csv_value_keeps_plain_values():
+    assert server.csv_value("Ayşe Yılmaz") == "Ayşe Yılmaz"
+    assert server.csv_value(True) == "true"
+    assert server.csv_value(datetime(2024, 1, 2, 3, 4)) == "2024-01-02T03:04:00"
+    assert server.csv_value(5) == 5
+
+
+def test_csv_export_escapes_contact_input():
+    rows = export_rows([{
+        "_id": "a1", "name": "=cmd|' /C calc'!A0", "email": "x@example.com", "phone": "+90 555 000 00 00",
+        "subject": "@Konu", "message": "Merhaba", "isRead": False, "createdAt": datetime(2024, 1, 1),
+    }])
+    assert rows[0] == server.CONTACT_EXPORT_FIELDS
+    assert rows[1] == ["a1", "'=cmd|' /C calc'!A0", "x@example.com", "'+90 555 000 00 00",
+                       "'@Konu", "Merhaba", "false", "2024-01-01T00:00:00"]
@@ -0,0 +1,81 @@
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('"xyz" , "abc"', True),
+    ('"xyz"', False),
+    ('"abc-gzip"', False),
+])
+def test_etag_matches(header, expected):
+    assert server.etag_matches(header, '"abc"') is expected
+
+
+@pytest.fixture
+def property_id(api, new_property):
+    return api.post("/api/properties", json=new_property).json()["_id"]
+
+
+@pytest.fixture
+def routes(property_id):
+    """Cached read routes and the Cache-Control each one sends"""
+    return [
+        ("/api/properties", server.PROPERTY_CACHE_CONTROL),
+        (f"/api/properties/{property_id}", server.PROPERTY_CACHE_CONTROL),
+        ("/api/company-info", server.COMPANY_INFO_CACHE_CONTROL),
+    ]
+
+
+def test_reads_carry_etag_and_cache_control(api, routes):
+    for path, cache_control in routes:
+        response = api.get(path, headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == cache_control
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["vary"] == "Accept-Encoding"
+        # Unchanged data keeps its ETag
+        assert api.get(path, headers={"Accept-Encoding": "identity"}).headers["etag"] == response.headers["etag"]
+
+
+@pytest.mark.parametrize("if_none_match", [
+    lambda etag: etag,
+    lambda etag: f"W/{etag}",
+    lambda etag: f'"stale", {etag}',
+    lambda etag: "*",
+])
+def test_matching_if_none_match_gets_304_without_body(api, routes, if_none_match):
+    for path, cache_control in routes:
+        etag = api.get(path, headers={"Accept-Encoding": "identity"}).headers["etag"]
+        response = api.get(path, headers={"Accept-Encoding": "identity", "If-None-Match": if_none_match(etag)})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == cache_control
+
+
+def test_stale_etag_gets_the_full_body(api, routes):
+    for path, _ in routes:
+        response = api.get(path, headers={"Accept-Encoding": "identity", "If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.content
+
+
+def test_write_changes_the_listing_etag(api, new_property):
+    etag = api.get("/api/properties").headers["etag"]
+    api.post("/api/properties", json=dict(new_property, title="Glyfada Villa"))
+    response = api.get("/api/properties", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_not_found_property_has_no_etag(api):
+    response = api.get("/api/properties/64b7f0c2a1b2c3d4e5f60718")
+    assert response.status_code == 404
+    assert "etag" not in response.headers
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import server
+
+
+def test_parse_near_returns_lng_lat():
+    assert server.parse_near("37.97,23.74") == [23.74, 37.97]
+
+
+@pytest.mark.parametrize("near", ["37.97", "37.97,23.74,1", "abc,23.74", "91,23.74", "37.97,181"])
+def test_parse_near_rejects_malformed(near):
+    with pytest.raises(HTTPException) as error:
+        server.parse_near(near)
+    assert error.value.status_code == 400
+
+
+def test_parse_within_returns_closed_polygon():
+    polygon = server.parse_within("37.9,23.7,38.0,23.8")
+    assert polygon["type"] == "Polygon"
+    ring = polygon["coordinates"][0]
+    assert ring[0] == ring[-1] == [23.7, 37.9]
+    assert [23.8, 38.0] in ring
+
+
+@pytest.mark.parametrize("within", ["37.9,23.7,38.0", "38.0,23.7,37.9,23.8", "37.9,23.8,38.0,23.7", "-91,0,0,1"])
+def test_parse_within_rejects_malformed(within):
+    with pytest.raises(HTTPException) as error:
+        server.parse_within(within)
+    assert error.value.status_code == 400
+
+
+def test_distance_cursor_round_trip():
+    doc = {"_id": ObjectId(), "distance": 1234.5678}
+    cursor = server.encode_cursor(doc, "distance")
+    assert server.decode_cursor(cursor, "distance") == (1234.5678, doc["_id"])
+    with pytest.raises(HTTPException):
+        server.decode_cursor(cursor, "price")
+
+
+class FakeGeoCollection:
+    """Runs the $geoNear pipelines of load_nearby over documents with precomputed distances
+
+    Like the real index it only orders by distance, so equidistant documents
+    come back in whatever order it likes (here: descending _id).
+    """
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.pipelines = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        geo_near = pipeline[0]["$geoNear"]
+        low, high = geo_near.get("minDistance", 0), geo_near["maxDistance"]
+        docs = [doc for doc in self.docs if low <= doc["distance"] <= high]
+        docs.sort(key=lambda doc: doc["_id"], reverse=True)
+        docs.sort(key=lambda doc: doc["distance"])
+        for stage in pipeline[1:]:
+            if "$match" in stage:
+                after, tie = stage["$match"]["$or"]
+                value, last_id = after["distance"]["$gt"], tie["_id"]["$gt"]
+                docs = [doc for doc in docs if (doc["distance"], doc["_id"]) > (value, last_id)]
+            elif "$sort" in stage:
+                docs.sort(key=lambda doc: doc["_id"])
+            elif "$limit" in stage:
+                docs = docs[:stage["$limit"]]
+        docs = [dict(doc) for doc in docs]
+        return SimpleNamespace(to_list=lambda length: asyncio.sleep(0, docs))
+
+
+def test_distance_pages_follow_distance_then_id(monkeypatch):
+    docs = [{"_id": ObjectId(), "title": str(i), "distance": distance}
+            for i, distance in enumerate([100, 200, 200, 200, 200, 300, 400])]
+    collection = FakeGeoCollection(docs)
+    monkeypatch.setattr(server, "db", SimpleNamespace(properties=collection))
+
+    async def read_all(limit):
+        seen, after = [], None
+        while True:
+            page, cursor = await server.load_properties_page(
+                {"isActive": True}, limit, ("title",), "distance", after, [23.74, 37.97], 5000)
+            seen += page
+            if not cursor:
+                return seen
+            after = server.decode_cursor(cursor, "distance")
+
+    for limit in (1, 2, 3, 10):
+        seen = asyncio.run(read_all(limit))
+        assert [prop["_id"] for prop in seen] == [doc["_id"] for doc in docs]
+
+    # The distance order of $geoNear is used as is; only tie groups are sorted on _id
+    first = collection.pipelines[0]
+    assert [next(iter(stage)) for stage in first] == ["$geoNear", "$limit", "$project"]
+    for pipeline in collection.pipelines:
+        if any("$sort" in stage for stage in pipeline):
+            geo_near = pipeline[0]["$geoNear"]
+            assert geo_near["minDistance"] == geo_near["maxDistance"]
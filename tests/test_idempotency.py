@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+
+def key_record(mock_db, key, route="POST /api/properties"):
+    return asyncio.run(mock_db.idempotency_keys.find_one({"_id": f"{route}|{key}"}))
+
+
+def test_property_body_is_the_same_with_and_without_key(new_property, api):
+    plain = api.post("/api/properties", json=new_property).json()
+    keyed = api.post("/api/properties", json=new_property, headers={"Idempotency-Key": "k1"}).json()
+    replayed = api.post("/api/properties", json=new_property, headers={"Idempotency-Key": "k1"})
+    assert set(keyed) == set(plain)
+    assert "geo" not in keyed and keyed["externalRef"] is None
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+    assert replayed.json() == keyed
+
+
+def test_pending_key_within_lease_gets_409(new_property, api, mock_db):
+    asyncio.run(mock_db.idempotency_keys.insert_one({
+        "_id": "POST /api/properties|k2", "requestHash": server.request_fingerprint(
+            server.PropertyCreate(**new_property).model_dump()),
+        "state": "pending", "lockedUntil": datetime.utcnow() + timedelta(seconds=60),
+        "expiresAt": datetime.utcnow() + timedelta(days=1),
+    }))
+    assert api.post("/api/properties", json=new_property, headers={"Idempotency-Key": "k2"}).status_code == 409
+
+
+def test_retry_takes_over_expired_lease(new_property, api, mock_db):
+    asyncio.run(mock_db.idempotency_keys.insert_one({
+        "_id": "POST /api/properties|k3", "requestHash": server.request_fingerprint(
+            server.PropertyCreate(**new_property).model_dump()),
+        "state": "pending", "lockedUntil": datetime.utcnow() - timedelta(seconds=1),
+        "expiresAt": datetime.utcnow() + timedelta(days=1),
+    }))
+    response = api.post("/api/properties", json=new_property, headers={"Idempotency-Key": "k3"})
+    assert response.status_code == 200
+    record = key_record(mock_db, "k3")
+    assert record["state"] == "done" and "lockedUntil" not in record
+
+
+def test_expired_lease_with_other_payload_gets_422(new_property, api, mock_db):
+    asyncio.run(mock_db.idempotency_keys.insert_one({
+        "_id": "POST /api/properties|k4", "requestHash": "other", "state": "pending",
+        "lockedUntil": datetime.utcnow() - timedelta(seconds=1),
+        "expiresAt": datetime.utcnow() + timedelta(days=1),
+    }))
+    assert api.post("/api/properties", json=new_property, headers={"Idempotency-Key": "k4"}).status_code == 422
+
+
+def test_failed_handler_releases_its_key(new_property, api, mock_db, monkeypatch):
+    async def broken(property):
+        raise server.HTTPException(status_code=500, detail="Error creating property")
+    monkeypatch.setattr(server, "store_property", broken)
+    assert api.post("/api/properties", json=new_property, headers={"Idempotency-Key": "k5"}).status_code == 500
+    assert key_record(mock_db, "k5") is None
+
+
+def contact_form():
+    return server.ContactCreate(name="Ayşe", email="ayse@example.com", phone="+90 555 000 0000",
+                                subject="Golden Visa", message="Bilgi almak istiyorum")
+
+
+def test_concurrent_identical_contacts_are_stored_once(mock_db, monkeypatch):
+    insert_one = type(mock_db.contacts).insert_one
+
+    async def slow_insert_one(self, *args, **kwargs):
+        await asyncio.sleep(0.01)
+        return await insert_one(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(mock_db.contacts), "insert_one", slow_insert_one)
+
+    async def run():
+        return await asyncio.gather(*(server.store_contact(contact_form()) for _ in range(3)))
+
+    responses = asyncio.run(run())
+    assert len({response["id"] for response in responses}) == 1
+    assert asyncio.run(mock_db.contacts.count_documents({})) == 1
+
+
+class QueueOnlyWriter:
+    def __init__(self):
+        self.queued = []
+
+    async def put(self, doc):
+        await asyncio.sleep(0)
+        self.queued.append(doc)
+
+
+def test_write_behind_dedupe_does_not_read_mongo(mock_db, monkeypatch):
+    writer = QueueOnlyWriter()
+    monkeypatch.setattr(server, "contact_writer", writer)
+
+    async def no_reads(*args, **kwargs):
+        raise AssertionError("contacts read on the request path")
+
+    monkeypatch.setattr(type(mock_db.contacts), "find_one", no_reads)
+
+    async def run():
+        first = await asyncio.gather(*(server.store_contact(contact_form()) for _ in range(2)))
+        return first + [await server.store_contact(contact_form())]
+
+    responses = asyncio.run(run())
+    assert len({response["id"] for response in responses}) == 1
+    assert len(writer.queued) == 1
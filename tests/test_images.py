@@ -0,0 +1,73 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+import server
+
+
+@pytest.fixture
+def media(monkeypatch, tmp_path):
+    """Render images in threads under a temporary MEDIA_ROOT"""
+    monkeypatch.setattr(server, "MEDIA_ROOT", tmp_path)
+    monkeypatch.setattr(server, "ProcessPoolExecutor", lambda workers, mp_context: ThreadPoolExecutor(workers))
+    monkeypatch.setattr(server, "image_executor", None)
+    yield tmp_path
+    if server.image_executor is not None:
+        server.image_executor.shutdown()
+
+
+def png(width=1200, height=800):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_upload_serves_original_and_variants_with_ranges(api, media):
+    data = png()
+    response = api.post("/api/images", files={"file": ("photo.png", data, "image/png")})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["format"], body["width"], body["height"]) == ("PNG", 1200, 800)
+
+    original = api.get(body["original"])
+    assert original.content == data
+    assert original.headers["cache-control"] == server.IMMUTABLE_CACHE_CONTROL
+    assert api.get(body["original"], headers={"If-None-Match": original.headers["etag"]}).status_code == 304
+
+    thumb = api.get(body["variants"]["thumb"])
+    assert thumb.headers["content-type"] == "image/jpeg"
+    with Image.open(io.BytesIO(thumb.content)) as image:
+        assert max(image.size) == 320
+
+    partial = api.get(body["variants"]["thumb"], headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.content == thumb.content[:10]
+    assert partial.headers["content-range"] == f"bytes 0-9/{len(thumb.content)}"
+
+
+def test_non_image_upload_is_rejected(api, media):
+    response = api.post("/api/images", files={"file": ("notes.txt", b"not an image", "text/plain")})
+    assert response.status_code == 400
+
+
+class BrokenExecutor:
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_is_replaced_by_the_next_upload(api, media, monkeypatch):
+    broken = BrokenExecutor()
+    monkeypatch.setattr(server, "image_executor", broken)
+    files = {"file": ("photo.png", png(64, 64), "image/png")}
+    assert api.post("/api/images", files=files).status_code == 500
+    assert broken.shut_down and server.image_executor is None
+    assert api.post("/api/images", files=files).status_code == 200
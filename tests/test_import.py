@@ -0,0 +1,39 @@
+import asyncio
+
+import server
+
+
+class StreamedBody:
+    """Stands in for a Starlette request whose body arrives in the given chunks"""
+
+    def __init__(self, *chunks):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def read_lines(*chunks, max_line_bytes=None):
+    async def collect():
+        return [item async for item in server.iter_ndjson_lines(StreamedBody(*chunks), max_line_bytes)]
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks():
+    assert read_lines(b'{"a":', b'1}\n\n{"b"', b':2}\n{"c":3}') == [
+        (1, b'{"a":1}'), (3, b'{"b":2}'), (4, b'{"c":3}'),
+    ]
+
+
+def test_oversized_line_is_skipped_to_next_newline():
+    lines = read_lines(b'{"a":1}\n' + b"x" * 6, b"x" * 6, b'xx\n{"b":2}\n', max_line_bytes=10)
+    assert lines == [(1, b'{"a":1}'), (2, None), (3, b'{"b":2}')]
+
+
+def test_oversized_last_line_without_newline():
+    assert read_lines(b'{"a":1}\n', b"y" * 20, max_line_bytes=10) == [(1, b'{"a":1}'), (2, None)]
+
+
+def test_line_at_limit_is_kept():
+    assert read_lines(b"z" * 5, b"z" * 5 + b"\n", max_line_bytes=10) == [(1, b"z" * 10)]
@@ -0,0 +1,18 @@
+def test_batch_keeps_order_and_reports_each_id(api, new_property):
+    first = api.post("/api/properties", json=new_property).json()["_id"]
+    second = api.post("/api/properties", json={**new_property, "title": "İkinci"}).json()["_id"]
+    missing = "507f1f77bcf86cd799439011"
+    items = api.post("/api/properties/batch", json={"ids": [second, "bad", first, missing]}).json()["items"]
+    assert [(item["id"], item["status"]) for item in items] == [
+        (second, "ok"), ("bad", "invalid"), (first, "ok"), (missing, "not_found"),
+    ]
+    assert items[0]["property"]["title"] == "İkinci"
+
+
+def test_batch_accepts_uppercase_ids(api, new_property):
+    property_id = api.post("/api/properties", json=new_property).json()["_id"]
+    assert api.get(f"/api/properties/{property_id.upper()}").status_code == 200
+    items = api.post("/api/properties/batch", json={"ids": [property_id.upper(), property_id]}).json()["items"]
+    assert [item["status"] for item in items] == ["ok", "ok"]
+    assert items[0]["id"] == property_id.upper()
+    assert items[0]["property"]["_id"] == property_id
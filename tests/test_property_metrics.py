@@ -0,0 +1,30 @@
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("size, expected", [
+    ("120 m²", 120),
+    ("85,5 m2", 85.5),
+    ("1.250 m²", 1250),
+    ("1.250,5 m²", 1250.5),
+    ("1,250.5 sqm", 1250.5),
+    ("3+1, 120 m²", 120),
+    ("2+1 / 95m²", 95),
+    ("Brüt 150 m² / Net 120 m²", 120),
+    ("Net: 110 m2, Brüt 140 m2", 110),
+    ("yaklaşık 90 metrekare", 90),
+    ("120", 120),
+])
+def test_parse_size_sqm(size, expected):
+    assert server.parse_size_sqm(size) == expected
+
+
+@pytest.mark.parametrize("size", [None, "", "3+1", "0 m²", "Deniz manzaralı"])
+def test_parse_size_sqm_without_area(size):
+    assert server.parse_size_sqm(size) is None
+
+
+def test_property_metrics():
+    assert server.property_metrics(450000, "3+1, 150 m²") == {"sizeSqm": 150, "pricePerSqm": 3000}
+    assert server.property_metrics(450000, "3+1") == {"sizeSqm": None, "pricePerSqm": None}
@@ -0,0 +1,65 @@
+import pytest
+
+import server
+
+
+def scope(forwarded=(), client=("10.0.0.1", 1234)):
+    return {"headers": [(b"x-forwarded-for", value.encode()) for value in forwarded], "client": client}
+
+
+@pytest.fixture
+def trust_proxy(monkeypatch):
+    monkeypatch.setattr(server, "RATE_LIMIT_TRUST_PROXY", True)
+    return server.RateLimitMiddleware(None)
+
+
+def test_client_key_uses_address_appended_by_proxy(trust_proxy):
+    assert trust_proxy.client_key(scope(["1.2.3.4, 203.0.113.7"])) == "203.0.113.7"
+
+
+def test_client_key_ignores_spoofed_entries(trust_proxy):
+    keys = {trust_proxy.client_key(scope([f"198.51.100.{i}, 203.0.113.7"])) for i in range(5)}
+    assert keys == {"203.0.113.7"}
+
+
+def test_client_key_counts_proxy_hops_across_headers(trust_proxy, monkeypatch):
+    monkeypatch.setattr(server, "RATE_LIMIT_PROXY_HOPS", 2)
+    assert trust_proxy.client_key(scope(["9.9.9.9, 203.0.113.7", "10.1.1.1"])) == "203.0.113.7"
+
+
+def test_client_key_falls_back_to_peer_without_enough_entries(trust_proxy, monkeypatch):
+    monkeypatch.setattr(server, "RATE_LIMIT_PROXY_HOPS", 2)
+    assert trust_proxy.client_key(scope(["203.0.113.7"])) == "10.0.0.1"
+
+
+def test_client_key_without_trusted_proxy():
+    assert server.RateLimitMiddleware(None).client_key(scope(["1.2.3.4"])) == "10.0.0.1"
+
+
+def test_override_for_new_route_gets_default_global_bucket():
+    policies = server.build_rate_limit_policies({}, {"POST /api/images": {"rate": 1, "burst": 5}})
+    policy = policies["POST /api/images"]
+    assert (policy.global_rate, policy.global_burst) == (10, 50)
+
+
+def test_override_merges_into_defaults():
+    policies = server.build_rate_limit_policies(server.DEFAULT_RATE_LIMITS, {"POST /api/contact": {"burst": 2}})
+    assert policies["POST /api/contact"].burst == 2
+    assert policies["POST /api/contact"].global_rate == 20
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"POST /api/x": {"rate": 1}}, "needs burst"),
+    ({"POST /api/contact": {"brust": 3}}, "unknown settings: brust"),
+    ({"POST /api/contact": {"rate": "fast"}}, "rate must be a non-negative number"),
+    ({"POST /api/contact": 5}, "must be an object"),
+    ({"POST /api/contact": {"rate": 0, "burst": 1}}, "rate must be greater than 0"),
+    ({"POST /api/contact": {"global_rate": 0}}, "global_rate must be greater than 0"),
+])
+def test_malformed_overrides_name_the_route(overrides, message):
+    with pytest.raises(ValueError, match=message):
+        server.build_rate_limit_policies(server.DEFAULT_RATE_LIMITS, overrides)
+
+
+def test_unauthenticated_writes_have_default_policies():
+    assert {"POST /api/properties/import", "POST /api/images"} <= set(server.rate_limit_policies)
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import server
+
+
+def test_pool_stats_survive_concurrent_events():
+    stats = server.MongoPoolStats()
+
+    def churn():
+        for _ in range(20000):
+            stats.connection_check_out_started(None)
+            stats.connection_checked_out(None)
+            stats.connection_checked_in(None)
+
+    threads = [threading.Thread(target=churn) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = stats.snapshot()
+    assert (snapshot["inUse"], snapshot["waiting"]) == (0, 0)
+
+
+def test_unbounded_pool_has_no_saturation(monkeypatch):
+    monkeypatch.setattr(server, "MONGO_MAX_POOL_SIZE", 0)
+    assert server.MongoPoolStats().snapshot()["saturation"] is None
+
+
+def test_warm_up_primes_the_landing_page_key(api, mock_db, monkeypatch):
+    monkeypatch.setattr(server, "MONGO_WARMUP_CONNECTIONS", 1)
+    monkeypatch.setattr(server, "app_ready", False)
+    assert asyncio.run(server.try_warm_up())
+    assert server.properties_cache_key() in server.read_cache._entries
+    entries = len(server.read_cache)
+    # The landing page asks for the first page without a limit (Investment.jsx)
+    assert api.get("/api/properties").status_code == 200
+    assert len(server.read_cache) == entries
+
+
+def test_warm_up_creates_indexes(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "MONGO_WARMUP_CONNECTIONS", 1)
+    monkeypatch.setattr(server, "app_ready", False)
+    assert asyncio.run(server.try_warm_up())
+    assert "expires_ttl" in asyncio.run(mock_db.idempotency_keys.index_information())
+    assert "external_ref" in asyncio.run(mock_db.properties.index_information())
+
+
+def test_warm_up_stays_unready_without_indexes(mock_db, monkeypatch):
+    async def down(self, indexes):
+        raise ConnectionError("no primary")
+
+    monkeypatch.setattr(server, "MONGO_WARMUP_CONNECTIONS", 1)
+    monkeypatch.setattr(server, "app_ready", False)
+    monkeypatch.setattr(type(mock_db.rate_limits), "create_indexes", down)
+    assert not asyncio.run(server.try_warm_up())
+    assert server.app_ready is False
+
+
+def test_ready_probe_does_not_rerun_warm_up(api, monkeypatch):
+    async def fail():
+        raise AssertionError("warm-up must not run from the probe")
+    monkeypatch.setattr(server, "try_warm_up", fail)
+    monkeypatch.setattr(server, "warm_up", fail)
+    monkeypatch.setattr(server, "app_ready", False)
+    response = api.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+
+def test_failed_warm_up_retries_in_the_background(monkeypatch):
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        return len(attempts) >= 3
+
+    async def run():
+        await server.warm_up()
+        await server.warm_up_task
+
+    monkeypatch.setattr(server, "try_warm_up", flaky)
+    monkeypatch.setattr(server, "WARMUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(server, "warm_up_task", None)
+    asyncio.run(run())
+    assert len(attempts) == 3
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+import server
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("İSTANBUL", "istanbul"),
+    ("Işık", "isik"),
+    ("AYVALIK", "ayvalik"),
+    ("Çeşme Göcek Üsküdar", "cesme gocek uskudar"),
+    ("Αθήνα", "αθηνα"),
+    ("ΑΘΉΝΑ", "αθηνα"),
+    ("Kifisiá", "kifisia"),
+])
+def test_fold_text(text, folded):
+    assert server.fold_text(text) == folded
+
+
+def test_tokenize_folds_and_splits_on_punctuation():
+    assert server.tokenize("Kadıköy, İSTANBUL - 3+1 daire") == ["kadikoy", "istanbul", "3", "1", "daire"]
+
+
+def prop(title, location="", description="", features=()):
+    return {"_id": ObjectId(), "title": title, "location": location, "description": description,
+            "features": list(features)}
+
+
+def test_title_match_outranks_description_match():
+    index = server.SearchIndex()
+    in_title, in_description = prop("Deniz Manzaralı Villa"), prop("Daire", description="Denize yakın villa")
+    for doc in (in_description, in_title):
+        index.add(doc)
+    ranked = [doc_id for doc_id, _ in index.search("villa", 10)]
+    assert ranked == [str(in_title["_id"]), str(in_description["_id"])]
+
+
+def test_rare_term_outweighs_common_term():
+    index = server.SearchIndex()
+    docs = [prop("Daire", location="Atina") for _ in range(5)] + [prop("Daire", location="Santorini")]
+    for doc in docs:
+        index.add(doc)
+    (best, _), *_ = index.search("daire santorini", 10)
+    assert best == str(docs[-1]["_id"])
+
+
+def test_last_term_matches_as_prefix():
+    index = server.SearchIndex()
+    doc = prop("Santorini Villa")
+    index.add(doc)
+    assert index.search("sant", 10)[0][0] == str(doc["_id"])
+    assert index.search("sant villa", 10) != [] and index.search("sant vil", 10) != []
+    assert index.search("sant zzz", 10) == []
+
+
+def test_remove_drops_postings_and_vocabulary():
+    index = server.SearchIndex()
+    doc = prop("Kolonaki")
+    index.add(doc)
+    index.remove(str(doc["_id"]))
+    assert index.search("kolonaki", 10) == [] and index._vocabulary == []
+
+
+class ResettingCollection:
+    """Yields documents and resets the index once, in the middle of the first build"""
+
+    def __init__(self, index, docs):
+        self.index = index
+        self.docs = docs
+        self.builds = 0
+
+    def find(self, query, fields):
+        self.builds += 1
+        build = self.builds
+
+        async def cursor():
+            for position, doc in enumerate(self.docs):
+                if build == 1 and position == 2:
+                    self.index.reset()
+                await asyncio.sleep(0)
+                yield doc
+        return cursor()
+
+
+def test_reset_during_build_restarts_it(monkeypatch):
+    index = server.SearchIndex()
+    docs = [prop(f"Villa {n}", location=name) for n, name in enumerate(["Atina", "Glyfada", "Pire", "Rodos"])]
+    collection = ResettingCollection(index, docs)
+    monkeypatch.setattr(server, "db", SimpleNamespace(properties=collection))
+    asyncio.run(index.ensure_built())
+    assert index.ready and collection.builds == 2
+    for doc in docs:
+        assert index.search(doc["location"], 1)[0][0] == str(doc["_id"])